@@ -79,6 +79,10 @@ class ServerConfig(Config): # pylint: disable=R0902
         #: Handler used for encoding errors. See `codecs error handlers <codecs>` for details.
         self.encoding_errors: StrOption = \
             StrOption('encoding_errors', "Handler used for encoding errors", default='strict')
+        #: Disable Nagle algorithm (TCP_NODELAY) on service manager connection.
+        #: Default: None (use Firebird configuration)
+        self.no_nagle: BoolOption = \
+            BoolOption('no_nagle', "Disable Nagle algorithm on service manager connection")
 
 class DatabaseConfig(Config): # pylint: disable=R0902
     """Database configuration.
@@ -38,25 +38,29 @@
 """
 
 from __future__ import annotations
-from typing import Any, Type, Union, Dict, Set, List, Tuple, Sequence, Mapping, Optional, \
-     BinaryIO, Callable
+from typing import Any, Type, Union, Dict, Set, List, Tuple, Sequence, Optional, \
+     BinaryIO, Callable, Iterator, Iterable
 import sys
 import os
 import weakref
 import itertools
 import threading
+import time
 import io
 import contextlib
 import struct
+import re
 import datetime
 import decimal
 import atexit
 from abc import ABC, abstractmethod
+from collections import deque, Counter
 from warnings import warn
+from functools import lru_cache, cached_property
 from pathlib import Path
-from queue import PriorityQueue
+from queue import SimpleQueue
 from ctypes import memset, memmove, create_string_buffer, byref, string_at, addressof, pointer
-from firebird.base.types import Sentinel, UNLIMITED, ByteOrder
+from firebird.base.types import Sentinel, UNLIMITED, NOT_FOUND, ByteOrder
 from firebird.base.logging import LoggingIdMixin, UNDEFINED
 from firebird.base.buffer import MemoryBuffer, BufferFactory, BytesBufferFactory, \
      CTypesBufferFactory, safe_ord
@@ -79,9 +83,9 @@ from .types import (Error, InterfaceError, DatabaseError, DataError,
                     SrvBackupOption, SrvRestoreOption, SrvNBackupOption, SrvRepairOption,
                     SrvPropertiesOption, SrvPropertiesFlag, SrvValidateOption,
                     SrvUserOption, SrvTraceOption, UserInfo, TraceSession, ReqInfoCode,
-                    StmtInfoCode, ImpData, ImpDataOld)
+                    StmtInfoCode, ImpData, ImpDataOld, PageStats, TransactionStats)
 from .interfaces import iAttachment, iTransaction, iStatement, iMessageMetadata, iBlob, \
-     iResultSet, iDtc, iService, iCryptKeyCallbackImpl
+     iResultSet, iDtc, iService, iCryptKeyCallbackImpl, iUtil, iMaster, iXpbBuilder
 from .hooks import APIHook, ConnectionHook, ServerHook, register_class, get_callbacks, add_hook
 from .config import driver_config
 
@@ -100,8 +104,11 @@ MAX_BLOB_SEGMENT_SIZE = 65535
 #: Current filesystem encoding
 FS_ENCODING = sys.getfilesystemencoding()
 
+#: Python encoding used for Firebird character set NONE
+_PREFERRED_ENCODING = a.getpreferredencoding()
+
 #: Python dictionary that maps Firebird character set names (key) to Python character sets (value).
-CHARSET_MAP = {None: a.getpreferredencoding(), 'NONE': a.getpreferredencoding(),
+CHARSET_MAP = {None: _PREFERRED_ENCODING, 'NONE': _PREFERRED_ENCODING,
                'OCTETS': None, 'UNICODE_FSS': 'utf_8', 'UTF8': 'utf_8', 'UTF-8': 'utf_8',
                'ASCII': 'ascii', 'SJIS_0208': 'shift_jis', 'EUCJ_0208': 'euc_jp',
                'DOS737': 'cp737', 'DOS437': 'cp437', 'DOS850': 'cp850',
@@ -132,11 +139,21 @@ _master = None
 _util = None
 _thns = threading.local()
 
-_tenTo = [10 ** x for x in range(30)]
-_i2name = {DbInfoCode.READ_SEQ_COUNT: 'sequential', DbInfoCode.READ_IDX_COUNT: 'indexed',
-           DbInfoCode.INSERT_COUNT: 'inserts', DbInfoCode.UPDATE_COUNT: 'updates',
-           DbInfoCode.DELETE_COUNT: 'deletes', DbInfoCode.BACKOUT_COUNT: 'backouts',
-           DbInfoCode.PURGE_COUNT: 'purges', DbInfoCode.EXPUNGE_COUNT: 'expunges'}
+_tenTo = tuple(10 ** x for x in range(30))
+#: Single-byte `bytes` objects for all byte values
+_BYTE = tuple(bytes((i, )) for i in range(256))
+#: Unpacks (relation ID, count) pairs of table access statistics info clusters
+_REL_COUNT = struct.Struct('<HI')
+#: Table access statistics info codes in order of `.TableAccessStats` count fields
+#: (sequential, indexed, inserts, updates, deletes, backouts, purges, expunges)
+_TABLE_STATS_CODES = (DbInfoCode.READ_SEQ_COUNT, DbInfoCode.READ_IDX_COUNT,
+                      DbInfoCode.INSERT_COUNT, DbInfoCode.UPDATE_COUNT,
+                      DbInfoCode.DELETE_COUNT, DbInfoCode.BACKOUT_COUNT,
+                      DbInfoCode.PURGE_COUNT, DbInfoCode.EXPUNGE_COUNT)
+#: Table access statistics info codes mapped to position of `.TableAccessStats` count field
+_TABLE_STATS_POS = {code: i for i, code in enumerate(_TABLE_STATS_CODES)}
+#: Info request for all table access statistics
+_TABLE_STATS_REQUEST = bytes(_TABLE_STATS_CODES)
 
 _bpb_stream = bytes([1, BPBItem.TYPE, 1, BlobType.STREAM])
 
@@ -145,6 +162,15 @@ isc_info_end = 1
 isc_info_truncated = 2
 isc_info_error = 3
 isc_info_data_not_ready = 4
+#: Info structural codes as items of ctypes char array
+_INFO_END = _BYTE[isc_info_end]
+_INFO_TRUNCATED = _BYTE[isc_info_truncated]
+
+# Service info tags used by output readers, as plain ints
+_SRV_LINE = SrvInfoCode.LINE.value
+_SRV_TIMEOUT = SrvInfoCode.TIMEOUT.value
+_SRV_LINE_REQ = _BYTE[_SRV_LINE]
+_SRV_STDIN_LINE_REQ = bytes((SrvInfoCode.STDIN, _SRV_LINE))
 
 def __api_loaded(api: a.FirebirdAPI) -> None:
     setattr(sys.modules[__name__], '_master', api.fb_get_master_interface())
@@ -152,6 +178,18 @@ def __api_loaded(api: a.FirebirdAPI) -> None:
 
 add_hook(APIHook.LOADED, a.FirebirdAPI, __api_loaded)
 
+def _get_util() -> iUtil:
+    # Returns cached `.iUtil` interface, loading Firebird API first when necessary
+    if _util is None:
+        a.get_api()
+    return _util
+
+def _get_master() -> iMaster:
+    # Returns cached `.iMaster` interface, loading Firebird API first when necessary
+    if _master is None:
+        a.get_api()
+    return _master
+
 @atexit.register
 def _api_shutdown():
     """Calls a smart shutdown of various Firebird subsystems (yValve, engine, redirector).
@@ -161,93 +199,176 @@ def _api_shutdown():
             provider.shutdown(0, -3) # fb_shutrsn_app_stopped
 
 def _create_blob_buffer(size: int=MAX_BLOB_SEGMENT_SIZE) -> Any:
-    if size < MAX_BLOB_SEGMENT_SIZE:
+    # Reused buffer is not cleared, callers must pass the actual data length to Firebird
+    if size <= MAX_BLOB_SEGMENT_SIZE:
         result = getattr(_thns, 'blob_buf', None)
         if result is None:
             result = create_string_buffer(MAX_BLOB_SEGMENT_SIZE)
             _thns.blob_buf = result
-        else:
-            memset(result, 0, MAX_BLOB_SEGMENT_SIZE)
     else:
         result = create_string_buffer(size)
     return result
 
+#: Max. number of idle SPB_START builders kept in per-thread pool
+_SPB_POOL_SIZE = 4
+
+@contextlib.contextmanager
+def _spb_start_builder() -> _SPBStartBuilder:
+    # Returns SPB_START builder from per-thread pool, and returns it back cleared on exit
+    pool = getattr(_thns, 'spb_pool', None)
+    if pool is None:
+        pool = []
+        _thns.spb_pool = pool
+    spb = pool.pop() if pool else _SPBStartBuilder()
+    try:
+        yield spb
+    finally:
+        if len(pool) < _SPB_POOL_SIZE:
+            spb.clear()
+            pool.append(spb)
+
+#: Packs ISC_TIMESTAMP (date, time) pair
+_pack_timestamp = struct.Struct('<iI').pack
+
+#: Ordinal of ISC_DATE day zero (1858-11-17, start of Modified Julian Day count)
+_ISC_DATE_EPOCH = datetime.date(1858, 11, 17).toordinal()
+
+def _encode_date(v: datetime.date) -> int:
+    # Same value as iUtil.encode_date(), without native call
+    return v.toordinal() - _ISC_DATE_EPOCH
+
+def _encode_time(v: datetime.time) -> int:
+    # Same value as iUtil.encode_time(), without native call (ISC_TIME is in 1/10000 s)
+    return ((v.hour * 60 + v.minute) * 60 + v.second) * 10000 + v.microsecond // 100
+
 def _encode_timestamp(v: Union[datetime.datetime, datetime.date]) -> bytes:
     # Convert datetime.datetime or datetime.date to BLR format timestamp
     if isinstance(v, datetime.datetime):
-        return _util.encode_date(v.date()).to_bytes(4, 'little') + _util.encode_time(v.time()).to_bytes(4, 'little')
+        return _pack_timestamp(_encode_date(v), _encode_time(v))
     if isinstance(v, datetime.date):
-        return _util.encode_date(v).to_bytes(4, 'little') + _util.encode_time(datetime.time()).to_bytes(4, 'little')
+        # Encoded midnight is zero
+        return _pack_timestamp(_encode_date(v), 0)
     raise ValueError("datetime.datetime or datetime.date expected")
 
+#: Character data types
+_TEXT_TYPES = frozenset((SQLDataType.TEXT, SQLDataType.VARYING))
+#: Integer data types that could hold fixed-point values
+_FIXED_INT_TYPES = frozenset((SQLDataType.SHORT, SQLDataType.LONG, SQLDataType.INT64))
+#: Floating-point data types
+_FLOAT_TYPES = frozenset((SQLDataType.FLOAT, SQLDataType.D_FLOAT, SQLDataType.DOUBLE))
+#: Floating-point data types that hold fixed-point values in dialect 1
+_FIXED_FLOAT_TYPES = frozenset((SQLDataType.DOUBLE, SQLDataType.D_FLOAT))
+#: Python type and display size reported in `Cursor.description` for data types
+#: that don't depend on column subtype or scale
+_DESC_TYPES = {SQLDataType.SHORT: (int, 6),
+               SQLDataType.LONG: (int, 11),
+               SQLDataType.INT64: (int, 20),
+               SQLDataType.TIMESTAMP: (datetime.datetime, 22),
+               SQLDataType.DATE: (datetime.date, 10),
+               SQLDataType.TIME: (datetime.time, 11),
+               SQLDataType.ARRAY: (list, -1),
+               SQLDataType.BOOLEAN: (bool, 5),
+               }
+
 def _is_fixed_point(dialect: int, datatype: SQLDataType, subtype: int,
                     scale: int) -> bool:
-    return ((datatype in (SQLDataType.SHORT, SQLDataType.LONG, SQLDataType.INT64)
-             and (subtype or scale))
-            or
-            ((dialect < 3) and scale
-             and (datatype in (SQLDataType.DOUBLE, SQLDataType.D_FLOAT)))
-            )
+    if datatype in _FIXED_INT_TYPES:
+        return bool(subtype or scale)
+    return bool(scale) and dialect < 3 and datatype in _FIXED_FLOAT_TYPES
+
+#: SQL type names for data types reported in error messages
+_EXTERNAL_TYPE_NAME = {SQLDataType.TEXT: 'CHAR', SQLDataType.VARYING: 'VARCHAR',
+                       SQLDataType.SHORT: 'SMALLINT', SQLDataType.LONG: 'INTEGER',
+                       SQLDataType.INT64: 'BIGINT', SQLDataType.FLOAT: 'FLOAT',
+                       SQLDataType.DOUBLE: 'DOUBLE', SQLDataType.D_FLOAT: 'DOUBLE',
+                       SQLDataType.TIMESTAMP: 'TIMESTAMP', SQLDataType.DATE: 'DATE',
+                       SQLDataType.TIME: 'TIME', SQLDataType.BLOB: 'BLOB',
+                       SQLDataType.BOOLEAN: 'BOOLEAN'}
+#: SQL type names for fixed-point subtypes
+_FIXED_POINT_TYPE_NAME = {1: 'NUMERIC', 2: 'DECIMAL'}
 
 def _get_external_data_type_name(dialect: int, datatype: SQLDataType,
                                  subtype: int, scale: int) -> str:
     if _is_fixed_point(dialect, datatype, subtype, scale):
-        return {1: 'NUMERIC', 2: 'DECIMAL'}.get(subtype, 'NUMERIC/DECIMAL')
-    return {SQLDataType.TEXT: 'CHAR', SQLDataType.VARYING: 'VARCHAR',
-            SQLDataType.SHORT: 'SMALLINT', SQLDataType.LONG: 'INTEGER',
-            SQLDataType.INT64: 'BIGINT', SQLDataType.FLOAT: 'FLOAT',
-            SQLDataType.DOUBLE: 'DOUBLE', SQLDataType.D_FLOAT: 'DOUBLE',
-            SQLDataType.TIMESTAMP: 'TIMESTAMP', SQLDataType.DATE: 'DATE',
-            SQLDataType.TIME: 'TIME', SQLDataType.BLOB: 'BLOB',
-            SQLDataType.BOOLEAN: 'BOOLEAN'}.get(datatype, 'UNKNOWN')
-
-def _get_internal_data_type_name(data_type: SQLDataType) -> str:
-    if data_type in (SQLDataType.DOUBLE, SQLDataType.D_FLOAT):
-        value = SQLDataType.DOUBLE
-    else:
-        value = data_type
-    return value.name
+        return _FIXED_POINT_TYPE_NAME.get(subtype, 'NUMERIC/DECIMAL')
+    return _EXTERNAL_TYPE_NAME.get(datatype, 'UNKNOWN')
+
+# Writers of fixed-size values into message buffers, called with (buffer, offset, value)
+_INT_PACKERS = {2: struct.Struct('<h').pack_into, 4: struct.Struct('<i').pack_into,
+                8: struct.Struct('<q').pack_into}
+_pack_uint32 = struct.Struct('<I').pack_into
+_pack_float = struct.Struct('f').pack_into
+_pack_double = struct.Struct('d').pack_into
+# Readers of fixed-size values from buffers, called with (buffer, offset)
+_INT_UNPACKERS = {2: struct.Struct('<h').unpack_from, 4: struct.Struct('<i').unpack_from,
+                  8: struct.Struct('<q').unpack_from}
+_unpack_uint16 = struct.Struct('<H').unpack_from
+_unpack_float = struct.Struct('f').unpack_from
+_unpack_double = struct.Struct('d').unpack_from
+
+#: Value ranges of integer data types
+_INT_RANGES = {SQLDataType.SHORT: (SHRT_MIN, SHRT_MAX),
+               SQLDataType.LONG: (INT_MIN, INT_MAX),
+               SQLDataType.INT64: (LONG_MIN, LONG_MAX)}
 
 def _check_integer_range(value: int, dialect: int, datatype: SQLDataType,
                          subtype: int, scale: int) -> None:
-    if datatype == SQLDataType.SHORT:
-        vmin = SHRT_MIN
-        vmax = SHRT_MAX
-    elif datatype == SQLDataType.LONG:
-        vmin = INT_MIN
-        vmax = INT_MAX
-    elif datatype == SQLDataType.INT64:
-        vmin = LONG_MIN
-        vmax = LONG_MAX
-    if (value < vmin) or (value > vmax):
+    vmin, vmax = _INT_RANGES[datatype]
+    if not vmin <= value <= vmax:
         msg = f"""numeric overflow: value {value}
 ({_get_external_data_type_name(dialect, datatype, subtype, scale)} scaled for {scale} decimal places) is of
-too great a magnitude to fit into its internal storage type {_get_internal_data_type_name(datatype)},
+too great a magnitude to fit into its internal storage type {datatype.name},
 which has range [{vmin},{vmax}]."""
         raise ValueError(msg)
 
 def _is_str_param(value: Any, datatype: SQLDataType) -> bool:
     return ((isinstance(value, str) and datatype != SQLDataType.BLOB) or
-            datatype in (SQLDataType.TEXT, SQLDataType.VARYING))
+            datatype in _TEXT_TYPES)
+
+# Service start (SPB_START) clumplet encoders used internally by `_SPBStartBuilder`.
+# SPB_START buffer has no version byte, starts with action tag, and uses tag + 4-byte int,
+# tag + 2-byte length + string, tag + single byte, or bare tag clumplets.
+def _spb_int(tag: int, value: int) -> bytes:
+    return struct.pack('<BI', tag, value & 0xFFFFFFFF)
+
+def _spb_byte(tag: int, value: int) -> bytes:
+    return bytes((tag, value))
+
+def _spb_string(tag: int, value: str, encoding: str='ascii', errors: str='strict') -> bytes:
+    # Not cached, values could be passwords or other sensitive data
+    value = value.encode(encoding, errors)
+    return struct.pack('<BH', tag, len(value)) + value
+
+def _fspec(value: FILESPEC) -> str:
+    # Returns file specification as str, without str() call when it's already a str
+    return value if type(value) is str else str(value) # pylint: disable=C0123
+
+@lru_cache(maxsize=512)
+def _encode_spb_str(value: str, encoding: str) -> bytes:
+    # Database names and roles are passed repeatedly to service calls, so encoded
+    # values are cached and passed to SPB builder as bytes.
+    return value.encode(encoding)
+
+@lru_cache(maxsize=16)
+def _make_request_bytes(timeout: int) -> Optional[bytes]:
+    # Service query send buffer with optional timeout clumplet.
+    if timeout == -1:
+        return None
+    return struct.pack('<BHH', SrvInfoCode.TIMEOUT, 2, timeout)
 
 def create_meta_descriptors(meta: iMessageMetadata) -> List[ItemMetadata]:
     "Returns list of metadata descriptors from statement metadata."
-    result = []
-    for i in range(meta.get_count()):
-        result.append(ItemMetadata(field=meta.get_field(i),
-                                   relation=meta.get_relation(i),
-                                   owner=meta.get_owner(i),
-                                   alias=meta.get_alias(i),
-                                   datatype=meta.get_type(i),
-                                   nullable=meta.is_nullable(i),
-                                   subtype=meta.get_subtype(i),
-                                   length=meta.get_length(i),
-                                   scale=meta.get_scale(i),
-                                   charset=meta.get_charset(i),
-                                   offset=meta.get_offset(i),
-                                   null_offset=meta.get_null_offset(i)
-                                   ))
-    return result
+    # Bound methods are resolved once, not for every column
+    get_field, get_relation, get_owner = meta.get_field, meta.get_relation, meta.get_owner
+    get_alias, get_type, is_nullable = meta.get_alias, meta.get_type, meta.is_nullable
+    get_subtype, get_length, get_scale = meta.get_subtype, meta.get_length, meta.get_scale
+    get_charset, get_offset, get_null_offset = meta.get_charset, meta.get_offset, \
+        meta.get_null_offset
+    # Arguments are passed in order of ItemMetadata fields
+    return [ItemMetadata(get_field(i), get_relation(i), get_owner(i), get_alias(i),
+                         get_type(i), is_nullable(i), get_subtype(i), get_length(i),
+                         get_scale(i), get_charset(i), get_offset(i), get_null_offset(i))
+            for i in range(meta.get_count())]
 
 # Context managers
 
@@ -296,6 +417,79 @@ def temp_database(*args, **kwargs) -> Connection:
 _OP_DIE = object()
 _OP_RECORD_AND_REREGISTER = object()
 
+# TPB tag classes recognized by `TPB.parse_buffer()`
+_TPB_ACCESS_MODES = frozenset(TraAccessMode._value2member_map_) # pylint: disable=E1101
+_TPB_ISOLATIONS = frozenset(TraIsolation._value2member_map_) # pylint: disable=E1101
+_TPB_READ_COMMITTED = frozenset(TraReadCommitted._value2member_map_) # pylint: disable=E1101
+_TPB_LOCK_RESOLUTIONS = frozenset(TraLockResolution._value2member_map_) # pylint: disable=E1101
+_TPB_TABLE_ACCESS_MODES = frozenset(TableAccessMode._value2member_map_) # pylint: disable=E1101
+_TPB_TABLE_SHARE_MODES = frozenset(TableShareMode._value2member_map_) # pylint: disable=E1101
+
+# DPB item readers, called with XPB builder and Python charset for strings
+def _xpb_true(xpb: iXpbBuilder, charset: str) -> bool: # pylint: disable=W0613
+    return True
+def _xpb_int(xpb: iXpbBuilder, charset: str) -> int: # pylint: disable=W0613
+    return xpb.get_int()
+def _xpb_bool(xpb: iXpbBuilder, charset: str) -> bool: # pylint: disable=W0613
+    return bool(xpb.get_int())
+def _xpb_str(xpb: iXpbBuilder, charset: str) -> str: # pylint: disable=W0613
+    return xpb.get_string()
+def _xpb_encoded_str(xpb: iXpbBuilder, charset: str) -> str:
+    return xpb.get_string(encoding=charset)
+
+#: DPB items recognized by `DPB.parse_buffer()`, mapped to `DPB` attribute name and reader
+_DPB_ITEMS: Dict[int, Tuple[str, Callable[[iXpbBuilder, str], Any]]] = {
+    DPBItem.CONFIG: ('config', _xpb_encoded_str),
+    DPBItem.AUTH_PLUGIN_LIST: ('auth_plugin_list', _xpb_str),
+    DPBItem.TRUSTED_AUTH: ('trusted_auth', _xpb_true),
+    DPBItem.USER_NAME: ('user', _xpb_encoded_str),
+    DPBItem.PASSWORD: ('password', _xpb_encoded_str),
+    DPBItem.CONNECT_TIMEOUT: ('timeout', _xpb_int),
+    DPBItem.DUMMY_PACKET_INTERVAL: ('dummy_packet_interval', _xpb_int),
+    DPBItem.SQL_ROLE_NAME: ('role', _xpb_encoded_str),
+    DPBItem.SQL_DIALECT: ('sql_dialect', _xpb_int),
+    DPBItem.LC_CTYPE: ('charset', _xpb_str),
+    DPBItem.NUM_BUFFERS: ('cache_size', _xpb_int),
+    DPBItem.NO_GARBAGE_COLLECT: ('no_gc', _xpb_bool),
+    DPBItem.UTF8_FILENAME: ('utf8filename', _xpb_bool),
+    DPBItem.NO_DB_TRIGGERS: ('no_db_triggers', _xpb_bool),
+    DPBItem.NOLINGER: ('no_linger', _xpb_bool),
+    DPBItem.DBKEY_SCOPE: ('dbkey_scope', lambda xpb, charset: DBKeyScope(xpb.get_int())),
+    DPBItem.PAGE_SIZE: ('page_size', _xpb_int),
+    DPBItem.OVERWRITE: ('overwrite', _xpb_bool),
+    DPBItem.SET_PAGE_BUFFERS: ('db_cache_size', _xpb_int),
+    DPBItem.FORCE_WRITE: ('forced_writes', _xpb_bool),
+    DPBItem.NO_RESERVE: ('reserve_space', lambda xpb, charset: not xpb.get_int()),
+    DPBItem.SET_DB_READONLY: ('read_only', _xpb_bool),
+    DPBItem.SWEEP_INTERVAL: ('sweep_interval', _xpb_int),
+    DPBItem.SET_DB_SQL_DIALECT: ('db_sql_dialect', _xpb_int),
+    DPBItem.SET_DB_CHARSET: ('db_charset', _xpb_str),
+    DPBItem.SESSION_TIME_ZONE: ('session_time_zone', _xpb_str),
+    DPBItem.SET_DB_REPLICA: ('set_db_replica', lambda xpb, charset: ReplicaMode(xpb.get_int())),
+    DPBItem.SET_BIND: ('set_bind', _xpb_str),
+    DPBItem.DECFLOAT_ROUND: ('decfloat_round',
+                             lambda xpb, charset: DecfloatRound(xpb.get_string())),
+    DPBItem.DECFLOAT_TRAPS: ('decfloat_traps',
+                             lambda xpb, charset: [DecfloatTraps(v.strip())
+                                                   for v in xpb.get_string().split(',')]),
+    DPBItem.PARALLEL_WORKERS: ('parallel_workers', _xpb_int),
+    }
+
+def _spb_encoded_str(xpb: iXpbBuilder, encoding: str, errors: str) -> str:
+    return xpb.get_string(encoding=encoding, errors=errors)
+
+#: SPB_ATTACH items recognized by `SPB_ATTACH.parse_buffer()`, mapped to `SPB_ATTACH`
+#: attribute name and reader called with XPB builder, encoding and encoding errors handler
+_SPB_ATTACH_ITEMS: Dict[int, Tuple[str, Callable[[iXpbBuilder, str, str], Any]]] = {
+    SPBItem.CONFIG: ('config', _spb_encoded_str),
+    SPBItem.AUTH_PLUGIN_LIST: ('auth_plugin_list', lambda xpb, encoding, errors: xpb.get_string()),
+    SPBItem.TRUSTED_AUTH: ('trusted_auth', lambda xpb, encoding, errors: True),
+    SPBItem.USER_NAME: ('user', _spb_encoded_str),
+    SPBItem.PASSWORD: ('password', _spb_encoded_str),
+    SPBItem.SQL_ROLE_NAME: ('role', _spb_encoded_str),
+    SPBItem.EXPECTED_DB: ('expected_db', _spb_encoded_str),
+    }
+
 # Managers for Parameter buffers
 class TPB: # pylint: disable=R0902
     """Transaction Parameter Buffer.
@@ -334,48 +528,17 @@ class TPB: # pylint: disable=R0902
         """Load information from TPB.
         """
         self.clear()
-        with a.get_api().util.get_xpb_builder(XpbKind.TPB, buffer) as tpb: # pylint: disable=W0621
+        handlers = self._TAG_HANDLERS
+        with _get_util().get_xpb_builder(XpbKind.TPB, buffer) as tpb: # pylint: disable=W0621
             while not tpb.is_eof():
                 tag = tpb.get_tag()
-                if tag in TraAccessMode._value2member_map_: # pylint: disable=E1101
-                    self.access_mode = TraAccessMode(tag)
-                elif tag in TraIsolation._value2member_map_: # pylint: disable=E1101
-                    isolation = TraIsolation(tag)
-                    if isolation != TraIsolation.READ_COMMITTED:
-                        self.isolation = Isolation(isolation)
-                elif tag in TraReadCommitted._value2member_map_: # pylint: disable=E1101
-                    isolation = TraReadCommitted(tag)
-                    if isolation == TraReadCommitted.RECORD_VERSION:
-                        self.isolation = Isolation.READ_COMMITTED_RECORD_VERSION
-                    else:
-                        self.isolation = Isolation.READ_COMMITTED_NO_RECORD_VERSION
-                elif tag in TraLockResolution._value2member_map_: # pylint: disable=E1101
-                    self.lock_timeout = -1 if TraLockResolution(tag).WAIT else 0
-                elif tag == TPBItem.AUTOCOMMIT:
-                    self.auto_commit = True
-                elif tag == TPBItem.NO_AUTO_UNDO:
-                    self.no_auto_undo = True
-                elif tag == TPBItem.IGNORE_LIMBO:
-                    self.ignore_limbo = True
-                elif tag == TPBItem.LOCK_TIMEOUT:
-                    self.lock_timeout = tpb.get_int()
-                elif tag == TPBItem.AT_SNAPSHOT_NUMBER:
-                    self.at_snapshot_number = tpb.get_bigint()
-                elif tag in TableAccessMode._value2member_map_: # pylint: disable=E1101
-                    tbl_access = TableAccessMode(tag)
-                    tbl_name = tpb.get_string(encoding=self.encoding)
-                    tpb.move_next()
-                    if tpb.is_eof():
-                        raise ValueError(f"Missing share mode value in table {tbl_name} reservation")
-                    if (val := tpb.get_tag()) not in TableShareMode._value2member_map_: # pylint: disable=E1101
-                        raise ValueError(f"Missing share mode value in table {tbl_name} reservation")
-                    tbl_share = TableShareMode(val)
-                    self.reserve_table(tbl_name, tbl_share, tbl_access)
+                if (handler := handlers.get(tag)) is not None:
+                    handler(self, tpb, tag)
                 tpb.move_next()
     def get_buffer(self) -> bytes:
         """Create TPB from stored information.
         """
-        with a.get_api().util.get_xpb_builder(XpbKind.TPB) as tpb: # pylint: disable=W0621
+        with _get_util().get_xpb_builder(XpbKind.TPB) as tpb: # pylint: disable=W0621
             tpb.insert_tag(self.access_mode)
             isolation = (Isolation.READ_COMMITTED_RECORD_VERSION
                          if self.isolation == Isolation.READ_COMMITTED
@@ -410,6 +573,50 @@ class TPB: # pylint: disable=R0902
         """Set information about table reservation.
         """
         self._table_reservation.append((name, share_mode, access_mode))
+    # TPB item parsers used by `parse_buffer()`
+    def __parse_access_mode(self, tpb: iXpbBuilder, tag: int) -> None: # pylint: disable=W0613
+        self.access_mode = TraAccessMode(tag)
+    def __parse_isolation(self, tpb: iXpbBuilder, tag: int) -> None: # pylint: disable=W0613
+        if tag != TraIsolation.READ_COMMITTED:
+            self.isolation = Isolation(tag)
+    def __parse_read_committed(self, tpb: iXpbBuilder, tag: int) -> None: # pylint: disable=W0613
+        self.isolation = (Isolation.READ_COMMITTED_RECORD_VERSION
+                          if tag == TraReadCommitted.RECORD_VERSION
+                          else Isolation.READ_COMMITTED_NO_RECORD_VERSION)
+    def __parse_lock_resolution(self, tpb: iXpbBuilder, tag: int) -> None: # pylint: disable=W0613
+        self.lock_timeout = -1 if tag == TraLockResolution.WAIT else 0
+    def __parse_auto_commit(self, tpb: iXpbBuilder, tag: int) -> None: # pylint: disable=W0613
+        self.auto_commit = True
+    def __parse_no_auto_undo(self, tpb: iXpbBuilder, tag: int) -> None: # pylint: disable=W0613
+        self.no_auto_undo = True
+    def __parse_ignore_limbo(self, tpb: iXpbBuilder, tag: int) -> None: # pylint: disable=W0613
+        self.ignore_limbo = True
+    def __parse_lock_timeout(self, tpb: iXpbBuilder, tag: int) -> None: # pylint: disable=W0613
+        self.lock_timeout = tpb.get_int()
+    def __parse_at_snapshot_number(self, tpb: iXpbBuilder, tag: int) -> None: # pylint: disable=W0613
+        self.at_snapshot_number = tpb.get_bigint()
+    def __parse_table_reservation(self, tpb: iXpbBuilder, tag: int) -> None:
+        tbl_access = TableAccessMode(tag)
+        tbl_name = tpb.get_string(encoding=self.encoding)
+        tpb.move_next()
+        if tpb.is_eof():
+            raise ValueError(f"Missing share mode value in table {tbl_name} reservation")
+        if (val := tpb.get_tag()) not in _TPB_TABLE_SHARE_MODES:
+            raise ValueError(f"Missing share mode value in table {tbl_name} reservation")
+        self.reserve_table(tbl_name, TableShareMode(val), tbl_access)
+    #: TPB tag -> parser
+    _TAG_HANDLERS: Dict[int, Callable] = {
+        **dict.fromkeys(_TPB_ACCESS_MODES, __parse_access_mode),
+        **dict.fromkeys(_TPB_ISOLATIONS, __parse_isolation),
+        **dict.fromkeys(_TPB_READ_COMMITTED, __parse_read_committed),
+        **dict.fromkeys(_TPB_LOCK_RESOLUTIONS, __parse_lock_resolution),
+        TPBItem.AUTOCOMMIT: __parse_auto_commit,
+        TPBItem.NO_AUTO_UNDO: __parse_no_auto_undo,
+        TPBItem.IGNORE_LIMBO: __parse_ignore_limbo,
+        TPBItem.LOCK_TIMEOUT: __parse_lock_timeout,
+        TPBItem.AT_SNAPSHOT_NUMBER: __parse_at_snapshot_number,
+        **dict.fromkeys(_TPB_TABLE_ACCESS_MODES, __parse_table_reservation),
+        }
 
 class DPB:
     """Database Parameter Buffer.
@@ -540,77 +747,29 @@ class DPB:
         """
         _py_charset: str = CHARSET_MAP.get(self.charset, 'ascii')
         self.clear()
-        with a.get_api().util.get_xpb_builder(XpbKind.DPB, buffer) as dpb:
+        with _get_util().get_xpb_builder(XpbKind.DPB, buffer) as dpb:
             while not dpb.is_eof():
-                tag = dpb.get_tag()
-                if tag == DPBItem.CONFIG:
-                    self.config = dpb.get_string(encoding=_py_charset)
-                elif tag == DPBItem.AUTH_PLUGIN_LIST:
-                    self.auth_plugin_list = dpb.get_string()
-                elif tag == DPBItem.TRUSTED_AUTH:
-                    self.trusted_auth = True
-                elif tag == DPBItem.USER_NAME:
-                    self.user = dpb.get_string(encoding=_py_charset)
-                elif tag == DPBItem.PASSWORD:
-                    self.password = dpb.get_string(encoding=_py_charset)
-                elif tag == DPBItem.CONNECT_TIMEOUT:
-                    self.timeout = dpb.get_int()
-                elif tag == DPBItem.DUMMY_PACKET_INTERVAL:
-                    self.dummy_packet_interval = dpb.get_int()
-                elif tag == DPBItem.SQL_ROLE_NAME:
-                    self.role = dpb.get_string(encoding=_py_charset)
-                elif tag == DPBItem.SQL_DIALECT:
-                    self.sql_dialect = dpb.get_int()
-                elif tag == DPBItem.LC_CTYPE:
-                    self.charset = dpb.get_string()
-                elif tag == DPBItem.NUM_BUFFERS:
-                    self.cache_size = dpb.get_int()
-                elif tag == DPBItem.NO_GARBAGE_COLLECT:
-                    self.no_gc = bool(dpb.get_int())
-                elif tag == DPBItem.UTF8_FILENAME:
-                    self.utf8filename = bool(dpb.get_int())
-                elif tag == DPBItem.NO_DB_TRIGGERS:
-                    self.no_db_triggers = bool(dpb.get_int())
-                elif tag == DPBItem.NOLINGER:
-                    self.no_linger = bool(dpb.get_int())
-                elif tag == DPBItem.DBKEY_SCOPE:
-                    self.dbkey_scope = DBKeyScope(dpb.get_int())
-                elif tag == DPBItem.PAGE_SIZE:
-                    self.page_size = dpb.get_int()
-                elif tag == DPBItem.OVERWRITE:
-                    self.overwrite = bool(dpb.get_int())
-                elif tag == DPBItem.SET_PAGE_BUFFERS:
-                    self.db_cache_size = dpb.get_int()
-                elif tag == DPBItem.FORCE_WRITE:
-                    self.forced_writes = bool(dpb.get_int())
-                elif tag == DPBItem.NO_RESERVE:
-                    self.reserve_space = not bool(dpb.get_int())
-                elif tag == DPBItem.SET_DB_READONLY:
-                    self.read_only = bool(dpb.get_int())
-                elif tag == DPBItem.SWEEP_INTERVAL:
-                    self.sweep_interval = dpb.get_int()
-                elif tag == DPBItem.SET_DB_SQL_DIALECT:
-                    self.db_sql_dialect = dpb.get_int()
-                elif tag == DPBItem.SET_DB_CHARSET:
-                    self.db_charset = dpb.get_string()
-                elif tag == DPBItem.SESSION_TIME_ZONE:
-                    self.session_time_zone = dpb.get_string()
-                elif tag == DPBItem.SET_DB_REPLICA:
-                    self.set_db_replica = ReplicaMode(dpb.get_int())
-                elif tag == DPBItem.SET_BIND:
-                    self.set_bind = dpb.get_string()
-                elif tag == DPBItem.DECFLOAT_ROUND:
-                    self.decfloat_round = DecfloatRound(dpb.get_string())
-                elif tag == DPBItem.DECFLOAT_TRAPS:
-                    self.decfloat_traps = [DecfloatTraps(v.strip())
-                                           for v in dpb.get_string().split(',')]
-                elif tag == DPBItem.PARALLEL_WORKERS:
-                    self.parallel_workers = dpb.get_int()
+                if (item := _DPB_ITEMS.get(dpb.get_tag())) is not None:
+                    name, reader = item
+                    setattr(self, name, reader(dpb, _py_charset))
+                dpb.move_next()
     def get_buffer(self, *, for_create: bool = False) -> bytes:
         """Create DPB from stored information.
-        """
+
+        Note:
+            Buffers without password are cached, so repeated calls with the same stored
+            information return the same `bytes` object without building it again.
+        """
+        if self.password is not None:
+            # Passwords must not be retained in cache
+            return self._build_buffer(for_create)
+        values = (getattr(self, name) for name in _DPB_FIELDS)
+        # List values (decfloat_traps) must be hashable
+        return _dpb_buffer(tuple(tuple(value) if isinstance(value, list) else value
+                                 for value in values), for_create)
+    def _build_buffer(self, for_create: bool) -> bytes:
         _py_charset: str = CHARSET_MAP.get(self.charset, 'ascii')
-        with a.get_api().util.get_xpb_builder(XpbKind.DPB) as dpb:
+        with _get_util().get_xpb_builder(XpbKind.DPB) as dpb:
             if self.config is not None:
                 dpb.insert_string(DPBItem.CONFIG, self.config, encoding=_py_charset)
             if self.trusted_auth:
@@ -682,6 +841,21 @@ class DPB:
             result = dpb.get_buffer()
         return result
 
+#: Names of `DPB` attributes used to build the DPB, in order of `DPB` constructor arguments
+_DPB_FIELDS = ('user', 'password', 'role', 'trusted_auth', 'sql_dialect', 'timeout', 'charset',
+               'cache_size', 'no_gc', 'no_db_triggers', 'no_linger', 'utf8filename',
+               'dbkey_scope', 'dummy_packet_interval', 'overwrite', 'db_cache_size',
+               'forced_writes', 'reserve_space', 'page_size', 'read_only', 'sweep_interval',
+               'db_sql_dialect', 'db_charset', 'config', 'auth_plugin_list',
+               'session_time_zone', 'set_db_replica', 'set_bind', 'decfloat_round',
+               'decfloat_traps', 'parallel_workers')
+
+@lru_cache(maxsize=64)
+def _dpb_buffer(values: Tuple, for_create: bool) -> bytes:
+    # Connection pools and reconnects pass the same parameters repeatedly, so built
+    # DPB buffers are cached by values of all DPB fields (only when password is not set).
+    return DPB(**dict(zip(_DPB_FIELDS, values)))._build_buffer(for_create)
+
 class SPB_ATTACH:
     """Service Parameter Buffer.
     """
@@ -704,32 +878,34 @@ class SPB_ATTACH:
         self.password = None
         self.trusted_auth = False
         self.config = None
+        self.auth_plugin_list = None
         self.expected_db = None
+        self.role = None
     def parse_buffer(self, buffer: bytes) -> None:
         """Load information from SPB_ATTACH.
         """
         self.clear()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_ATTACH, buffer) as spb:
+        with _get_util().get_xpb_builder(XpbKind.SPB_ATTACH, buffer) as spb:
             while not spb.is_eof():
-                tag = spb.get_tag()
-                if tag == SPBItem.CONFIG:
-                    self.config = spb.get_string(encoding=self.encoding, errors=self.errors)
-                elif tag == SPBItem.AUTH_PLUGIN_LIST:
-                    self.auth_plugin_list = spb.get_string()
-                elif tag == SPBItem.TRUSTED_AUTH:
-                    self.trusted_auth = True
-                elif tag == SPBItem.USER_NAME:
-                    self.user = spb.get_string(encoding=self.encoding, errors=self.errors)
-                elif tag == SPBItem.PASSWORD:
-                    self.password = spb.get_string(encoding=self.encoding, errors=self.errors)
-                elif tag == SPBItem.SQL_ROLE_NAME:
-                    self.role = spb.get_string(encoding=self.encoding, errors=self.errors)
-                elif tag == SPBItem.EXPECTED_DB:
-                    self.expected_db = spb.get_string(encoding=self.encoding, errors=self.errors)
+                if (item := _SPB_ATTACH_ITEMS.get(spb.get_tag())) is not None:
+                    name, reader = item
+                    setattr(self, name, reader(spb, self.encoding, self.errors))
+                spb.move_next()
     def get_buffer(self) -> bytes:
         """Create SPB_ATTACH from stored information.
-        """
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_ATTACH) as spb:
+
+        Note:
+            Buffers without password are cached, so repeated calls with the same stored
+            information return the same `bytes` object without building it again.
+        """
+        if self.password is not None:
+            # Passwords must not be retained in cache
+            return self._build_buffer()
+        return _spb_attach_buffer(self.user, self.config, self.trusted_auth,
+                                  self.auth_plugin_list, self.expected_db, self.encoding,
+                                  self.errors, self.role)
+    def _build_buffer(self) -> bytes:
+        with _get_util().get_xpb_builder(XpbKind.SPB_ATTACH) as spb:
             if self.config is not None:
                 spb.insert_string(SPBItem.CONFIG, self.config, encoding=self.encoding,
                                   errors=self.errors)
@@ -753,6 +929,80 @@ class SPB_ATTACH:
             result = spb.get_buffer()
         return result
 
+@lru_cache(maxsize=32)
+def _spb_attach_buffer(user: str, config: str, trusted_auth: bool,
+                       auth_plugin_list: str, expected_db: str, encoding: str,
+                       errors: str, role: str) -> bytes:
+    # Short-lived tools tend to reconnect with the same parameters, so built
+    # SPB_ATTACH buffers without password are cached.
+    return SPB_ATTACH(user=user, config=config,
+                      trusted_auth=trusted_auth, auth_plugin_list=auth_plugin_list,
+                      expected_db=expected_db, encoding=encoding, errors=errors,
+                      role=role)._build_buffer()
+
+
+class _SPBStartBuilder:
+    """Service start (SPB_START) parameter buffer builder.
+
+    Pure Python replacement for `.iXpbBuilder` of `XpbKind.SPB_START` kind, so SPB could be
+    composed without native call for every clumplet. Unlike `.iXpbBuilder`, clumplet type
+    is not derived from tag, so single-byte values must be inserted with `insert_byte()`.
+    """
+    def __init__(self):
+        self._buf: bytearray = bytearray()
+    def clear(self) -> None:
+        """Clears the buffer.
+        """
+        self._buf.clear()
+    def insert_tag(self, tag: int) -> None:
+        """Inserts clumplet without value.
+        """
+        self._buf.append(tag)
+    def insert_byte(self, tag: int, value: int) -> None:
+        """Inserts clumplet with single-byte value.
+        """
+        self._buf += _spb_byte(tag, value)
+    def insert_int(self, tag: int, value: int) -> None:
+        """Inserts clumplet with 4-byte integer value.
+        """
+        self._buf += _spb_int(tag, value)
+    def insert_bigint(self, tag: int, value: int) -> None:
+        """Inserts clumplet with 8-byte integer value.
+        """
+        self._buf += struct.pack('<BQ', tag, value & 0xFFFFFFFFFFFFFFFF)
+    def insert_bytes(self, tag: int, value: bytes) -> None:
+        """Inserts clumplet with binary value (2-byte length followed by data).
+        """
+        self._buf += struct.pack('<BH', tag, len(value))
+        self._buf += value
+    def insert_string(self, tag: int, value: str, *, encoding: str='ascii',
+                      errors: str='strict') -> None:
+        """Inserts clumplet with string value (2-byte length followed by data).
+        """
+        self._buf += _spb_string(tag, value, encoding, errors)
+    def insert_action(self, action: ServerAction, database: FILESPEC, role: Optional[str],
+                      encoding: str) -> None:
+        """Inserts service action tag followed by database name and SQL role (if specified).
+        """
+        self._buf.append(action)
+        self.insert_bytes(SPBItem.DBNAME, _encode_spb_str(_fspec(database), encoding))
+        if role is not None:
+            self.insert_bytes(SPBItem.SQL_ROLE_NAME, _encode_spb_str(role, encoding))
+    def insert_strings(self, tag: int, values: Iterable, *, encoding: str='ascii',
+                       errors: str='strict') -> None:
+        """Inserts string clumplet with the same tag for each value. Values that are not
+        strings (like `~pathlib.Path`) are converted using `str()`.
+        """
+        self._buf += b''.join([_spb_string(tag, _fspec(value), encoding, errors)
+                               for value in values])
+    def insert_raw(self, data: bytes) -> None:
+        """Appends already encoded clumplet(s).
+        """
+        self._buf += data
+    def get_buffer(self) -> bytes:
+        """Returns content of the buffer.
+        """
+        return bytes(self._buf)
 
 class Buffer(MemoryBuffer):
     """MemoryBuffer with extensions.
@@ -766,7 +1016,16 @@ class Buffer(MemoryBuffer):
         """Set the position in buffer to first non-zero byte when searched from
         the end of buffer.
         """
-        self.pos = self.last_data
+        # Trailing zeros are stripped in C instead of scanning them one by one
+        self.pos = len(bytes(self.raw).rstrip(b'\x00')) - 1
+    def renew(self, size: int) -> None:
+        """Replace the buffer with new zero-filled one of specified size, and reset the
+        position in buffer to zero. Unlike `resize()`, current content is not copied.
+        """
+        if self.max_size is not UNLIMITED and self.max_size < size:
+            raise IOError(f"Cannot resize buffer past max. size {self.max_size} bytes")
+        self.raw = self.factory.create(size)
+        self.pos = 0
     def get_tag(self) -> int:
         """Read 1 byte number (c_ubyte).
         """
@@ -786,6 +1045,23 @@ class CBuffer(Buffer):
     def __init__(self, init: Union[int, bytes], size: int = None, *,
                  max_size: Union[int, Sentinel]=UNLIMITED, byteorder: ByteOrder=ByteOrder.LITTLE):
         super().__init__(init, size, factory=CTypesBufferFactory, max_size=max_size, byteorder=byteorder)
+    # Items of ctypes char array are single-byte `bytes`, so tags are compared as such
+    # instead of converting every item with `safe_ord()`.
+    def is_eof(self) -> bool:
+        """Return True when positioned past the end of buffer or on `isc_info_end` tag.
+        """
+        return self.pos >= len(self.raw) or self.raw[self.pos] == _INFO_END
+    def is_truncated(self) -> bool:
+        """Return True when positioned on `isc_info_truncated` tag.
+        """
+        return self.raw[self.pos] == _INFO_TRUNCATED
+    def get_tag(self) -> int:
+        """Read 1 byte number (c_ubyte).
+        """
+        if self.pos >= len(self.raw):
+            raise IOError("Insufficient buffer size")
+        self.pos += 1
+        return ord(self.raw[self.pos - 1])
 
 class EventBlock:
     """Used internally by `EventCollector`.
@@ -797,7 +1073,7 @@ class EventBlock:
             self.__queue.put((_OP_RECORD_AND_REREGISTER, self))
             return 0
 
-        self.__queue: PriorityQueue = weakref.proxy(queue)
+        self.__queue: SimpleQueue = weakref.proxy(queue)
         self._db_handle: a.FB_API_HANDLE = db_handle
         self._isc_status: a.ISC_STATUS_ARRAY = a.ISC_STATUS_ARRAY(0)
         self.event_names: List[str] = event_names
@@ -818,8 +1094,6 @@ class EventBlock:
         if not self.__closed:
             warn("EventBlock disposed without prior close()", ResourceWarning)
             self.close()
-    def __lt__(self, other):
-        return self.event_id.value < other.event_id.value
     def __wait_for_events(self) -> None:
         a.api.isc_que_events(self._isc_status, self._db_handle, self.event_id,
                              self.buf_length, self.event_buf,
@@ -833,7 +1107,6 @@ class EventBlock:
     def count_and_reregister(self) -> Dict[str, int]:
         """Count event occurences and re-register interest in further notifications.
         """
-        result = {}
         a.api.isc_event_counts(self.__results, self.buf_length,
                                self.event_buf, self.result_buf)
         if self.__first:
@@ -842,8 +1115,8 @@ class EventBlock:
             self.__wait_for_events()
             return None
 
-        for i, name in enumerate(self.event_names):
-            result[name] = int(self.__results[i])
+        # Slice of ctypes integer array is converted to list of ints in single C-level copy
+        result = dict(zip(self.event_names, self.__results[:len(self.event_names)]))
         self.__wait_for_events()
         return result
     def close(self) -> None:
@@ -895,7 +1168,7 @@ class EventCollector:
         self.__events: Dict[str, int] = dict.fromkeys(self.__event_names, 0)
         self.__event_blocks: List[EventBlock] = []
         self.__closed: bool = False
-        self.__queue: PriorityQueue = PriorityQueue()
+        self.__queue: SimpleQueue = SimpleQueue()
         self.__events_ready: threading.Event = threading.Event()
         self.__blocks: List[List[str]] = [[x for x in y if x] for y in itertools.zip_longest(*[iter(event_names)]*15)]
         self.__initialized: bool = False
@@ -914,7 +1187,7 @@ class EventCollector:
 
         Must be called directly or through context manager interface.
         """
-        def event_process(queue: PriorityQueue):
+        def event_process(queue: SimpleQueue):
             while True:
                 operation, data = queue.get()
                 if operation is _OP_RECORD_AND_REREGISTER:
@@ -1002,10 +1275,12 @@ class InfoProvider(ABC):
         response (CBuffer): Internal buffer for response packet acquired via Firebird API.
         request (Buffer): Internal buffer for information request packet needed by Firebird API.
     """
+    #: Response buffer sizes learned for info requests that didn't fit into initial
+    #: buffer, shared by all instances of provider class. None disables the hints.
+    _size_hints: Optional[Dict[bytes, int]] = None
     def __init__(self, charset: str, buffer_size: int=256):
         self._charset: str = charset
         self.response: CBuffer = CBuffer(buffer_size)
-        self.request: Buffer = Buffer(10)
         self._cache: Dict = {}
     def _raise_not_supported(self) -> None:
         raise NotSupportedError("Requested functionality is not supported by used Firebird version.")
@@ -1035,12 +1310,18 @@ class InfoProvider(ABC):
             InterfaceError: If information cannot be successfuly stored into buffer
                 of `max_size`, or response is ivalid.
         """
+        if self._size_hints is not None \
+           and (hint := self._size_hints.get(request, 0)) > len(self.response.raw):
+            self.response.renew(hint)
         while True:
             self._acquire(request)
             if self.response.is_truncated():
                 if (buf_size := len(self.response.raw)) < max_size:
                     buf_size = min(buf_size * 2, max_size)
-                    self.response.resize(buf_size)
+                    # Truncated response is discarded, so it's not copied to new buffer
+                    self.response.renew(buf_size)
+                    if self._size_hints is not None:
+                        self._size_hints[request] = buf_size
                     continue
                 raise InterfaceError("Response too large")  # pragma: no cover
             break
@@ -1048,6 +1329,25 @@ class InfoProvider(ABC):
         if not self.response.is_eof():  # pragma: no cover
             raise InterfaceError("Invalid response format")
         self.response.rewind()
+    @cached_property
+    def request(self) -> Buffer:
+        """Internal buffer for information request packet needed by Firebird API.
+
+        The buffer is created on first access, as info requests are passed as `bytes`.
+        """
+        return Buffer(10)
+
+def _version_number(verstr: str) -> str:
+    "Returns version number from server version string."
+    x = verstr.split()
+    if x[0].find('V') > 0:
+        (x, result) = x[0].split('V')
+    elif x[0].find('T') > 0:  # pragma: no cover
+        (x, result) = x[0].split('T')
+    else: # pragma: no cover
+        # Unknown version
+        result = '0.0.0.0'
+    return result
 
 class EngineVersionProvider(InfoProvider):
     """Engine version provider for internal use by driver.
@@ -1073,7 +1373,7 @@ class EngineVersionProvider(InfoProvider):
         self.con = con
         info_code = DbInfoCode.FIREBIRD_VERSION if isinstance(con(), Connection) \
             else SrvInfoCode.SERVER_VERSION
-        self._get_data(bytes([info_code]))
+        self._get_data(_BYTE[info_code])
         tag = self.response.get_tag()
         if tag != info_code.value:
             if tag == isc_info_error:  # pragma: no cover
@@ -1082,15 +1382,7 @@ class EngineVersionProvider(InfoProvider):
         if isinstance(con(), Connection):
             self.response.read_byte()  # Cluster length
             self.response.read_short()  # number of strings
-        verstr: str = self.response.read_pascal_string()
-        x = verstr.split()
-        if x[0].find('V') > 0:
-            (x, result) = x[0].split('V')
-        elif x[0].find('T') > 0:  # pragma: no cover
-            (x, result) = x[0].split('T')
-        else: # pragma: no cover
-            # Unknown version
-            result = '0.0.0.0'
+        result = _version_number(self.response.read_pascal_string())
         self.response.rewind()
         self.con = None
         return result
@@ -1101,6 +1393,48 @@ class EngineVersionProvider(InfoProvider):
 
 _engine_version_provider: EngineVersionProvider = EngineVersionProvider('utf8')
 
+#: Database info codes with repeated item clusters
+_DB_INFO_TRA_LISTS = frozenset((DbInfoCode.ACTIVE_TRANSACTIONS, DbInfoCode.LIMBO))
+#: Database info codes with values that don't change for attachment, and are thus cached
+_DB_INFO_CACHED = frozenset((DbInfoCode.CREATION_DATE, DbInfoCode.DB_CLASS,
+                             DbInfoCode.DB_PROVIDER, DbInfoCode.DB_SQL_DIALECT,
+                             DbInfoCode.ODS_MINOR_VERSION, DbInfoCode.ODS_VERSION,
+                             DbInfoCode.PAGE_SIZE, DbInfoCode.VERSION,
+                             DbInfoCode.FIREBIRD_VERSION, DbInfoCode.IMPLEMENTATION_OLD,
+                             DbInfoCode.IMPLEMENTATION, DbInfoCode.DB_ID,
+                             DbInfoCode.BASE_LEVEL, DbInfoCode.ATTACHMENT_ID))
+#: Database info request for values prefetched by `DatabaseInfoProvider3`
+_DB_INFO_PREFETCH = bytes((DbInfoCode.PAGE_SIZE, DbInfoCode.FIREBIRD_VERSION))
+#: Database info codes for values returned by `DatabaseInfoProvider3.page_stats`
+_DB_INFO_PAGE_STATS = (DbInfoCode.ALLOCATION, DbInfoCode.DB_SIZE_IN_PAGES,
+                       DbInfoCode.PAGES_USED, DbInfoCode.PAGES_FREE)
+#: Database info codes for values returned by `DatabaseInfoProvider3.transaction_stats`
+_DB_INFO_TRA_STATS = (DbInfoCode.OLDEST_TRANSACTION, DbInfoCode.OLDEST_ACTIVE,
+                      DbInfoCode.OLDEST_SNAPSHOT, DbInfoCode.NEXT_TRANSACTION)
+#: Database info codes with numeric value. Their responses always fit into response buffer.
+_DB_INFO_NUMBERS = frozenset((DbInfoCode.ALLOCATION, DbInfoCode.NO_RESERVE,
+                              DbInfoCode.DB_SQL_DIALECT, DbInfoCode.ODS_MINOR_VERSION,
+                              DbInfoCode.ODS_VERSION, DbInfoCode.PAGE_SIZE,
+                              DbInfoCode.CURRENT_MEMORY, DbInfoCode.FORCED_WRITES,
+                              DbInfoCode.MAX_MEMORY, DbInfoCode.NUM_BUFFERS,
+                              DbInfoCode.SWEEP_INTERVAL, DbInfoCode.ATTACHMENT_ID,
+                              DbInfoCode.FETCHES, DbInfoCode.MARKS, DbInfoCode.READS,
+                              DbInfoCode.WRITES, DbInfoCode.SET_PAGE_BUFFERS,
+                              DbInfoCode.DB_READ_ONLY, DbInfoCode.DB_SIZE_IN_PAGES,
+                              DbInfoCode.PAGE_ERRORS, DbInfoCode.RECORD_ERRORS,
+                              DbInfoCode.BPAGE_ERRORS, DbInfoCode.DPAGE_ERRORS,
+                              DbInfoCode.IPAGE_ERRORS, DbInfoCode.PPAGE_ERRORS,
+                              DbInfoCode.TPAGE_ERRORS, DbInfoCode.ATT_CHARSET,
+                              DbInfoCode.OLDEST_TRANSACTION, DbInfoCode.OLDEST_ACTIVE,
+                              DbInfoCode.OLDEST_SNAPSHOT, DbInfoCode.NEXT_TRANSACTION,
+                              DbInfoCode.ACTIVE_TRAN_COUNT, DbInfoCode.DB_CLASS,
+                              DbInfoCode.DB_PROVIDER, DbInfoCode.PAGES_USED,
+                              DbInfoCode.PAGES_FREE, DbInfoCode.DB_FILE_SIZE,
+                              DbInfoCode.SES_IDLE_TIMEOUT_DB, DbInfoCode.SES_IDLE_TIMEOUT_ATT,
+                              DbInfoCode.SES_IDLE_TIMEOUT_RUN, DbInfoCode.STMT_TIMEOUT_DB,
+                              DbInfoCode.STMT_TIMEOUT_ATT, DbInfoCode.PROTOCOL_VERSION,
+                              DbInfoCode.NEXT_ATTACHMENT, DbInfoCode.NEXT_STATEMENT))
+
 class DatabaseInfoProvider3(InfoProvider):
     """Provides access to information about attached database [Firebird 3+].
 
@@ -1120,8 +1454,8 @@ class DatabaseInfoProvider3(InfoProvider):
              DbInfoCode.VERSION: self._version_string,
              DbInfoCode.FIREBIRD_VERSION: self._version_string,
              DbInfoCode.USER_NAMES: self.__user_names,
-             DbInfoCode.ACTIVE_TRANSACTIONS: self.__tra_active,
-             DbInfoCode.LIMBO: self.__tra_limbo,
+             DbInfoCode.ACTIVE_TRANSACTIONS: self.__tra_ids,
+             DbInfoCode.LIMBO: self.__tra_ids,
              DbInfoCode.ALLOCATION: self.response.read_sized_int,
              DbInfoCode.NO_RESERVE: self.response.read_sized_int,
              DbInfoCode.DB_SQL_DIALECT: self.response.read_sized_int,
@@ -1173,10 +1507,16 @@ class DatabaseInfoProvider3(InfoProvider):
              DbInfoCode.PAGE_CONTENTS: self.response.read_bytes,
              DbInfoCode.DB_FILE_SIZE: self.response.read_sized_int,
              }
-        # Page size
-        self.__page_size = self.get_info(DbInfoCode.PAGE_SIZE)  # prefetch it
-        # Get Firebird engine version
-        self.__version = _engine_version_provider.get_server_version(self._con)
+        # Page size and Firebird engine version are prefetched with single request
+        self._get_data(_DB_INFO_PREFETCH)
+        for info_code in (DbInfoCode.PAGE_SIZE, DbInfoCode.FIREBIRD_VERSION):
+            if (tag := self.response.get_tag()) != info_code:
+                if tag == isc_info_error:  # pragma: no cover
+                    raise InterfaceError("An error response was received")
+                raise InterfaceError("Result code does not match request code") # pragma: no cover
+            self._cache[info_code] = self._handlers[info_code]()
+        self.__page_size = self._cache[DbInfoCode.PAGE_SIZE]
+        self.__version = _version_number(self._cache[DbInfoCode.FIREBIRD_VERSION])
         x = self.__version.split('.')
         self.__engine_version = float(f'{x[0]}.{x[1]}')
     def __base_level(self) -> int:
@@ -1196,12 +1536,10 @@ class DatabaseInfoProvider3(InfoProvider):
         self.response.read_short() # Cluster length
         seqences = self.response.read_byte()  # Cluster length
         while seqences:
-            result.append(ImpData(ImpCPU(self.response.read_byte()),
-                                  ImpOS(self.response.read_byte()),
-                                  ImpCompiler(self.response.read_byte()),
-                                  ImpFlags(self.response.read_byte()),
-                                  DbClass(self.response.read_byte()),
-                                  self.response.read_byte()))
+            # Six single-byte values, unpacking `bytes` yields ints
+            cpu, os_, compiler, flags, db_class, depth = self.response.read(6)
+            result.append(ImpData(ImpCPU(cpu), ImpOS(os_), ImpCompiler(compiler),
+                                  ImpFlags(flags), DbClass(db_class), depth))
             seqences -= 1
         return tuple(result)
     def __implementation_old(self) -> Tuple[ImpDataOld]:
@@ -1209,8 +1547,8 @@ class DatabaseInfoProvider3(InfoProvider):
         self.response.read_short() # Cluster length
         seqences = self.response.read_byte()  # Cluster length
         while seqences:
-            result.append(ImpDataOld(Implementation(self.response.read_byte()),
-                                     DbClass(self.response.read_byte())))
+            implementation, db_class = self.response.read(2)
+            result.append(ImpDataOld(Implementation(implementation), DbClass(db_class)))
             seqences -= 1
         return tuple(result)
     def _version_string(self) -> str:
@@ -1223,42 +1561,46 @@ class DatabaseInfoProvider3(InfoProvider):
     def _single_info_string(self) -> str:
         return self.response.read_sized_string()
     def __user_names(self) -> Dict[str, str]:
-        self.response.rewind() # necessary to process names separated by info tag
-        usernames = []
-        while not self.response.is_eof():
-            self.response.get_tag() # DbInfoCode.USER_NAMES
-            self.response.read_short()  # cluster length
-            usernames.append(self.response.read_pascal_string(encoding=self._charset))
+        # Response contains one cluster per attachment (names are separated by info tag),
+        # so it's walked in single pass over the buffer instead of per-item buffer calls.
+        # Each cluster is: tag, 2-byte cluster length, 1-byte name length, name.
+        data = memoryview(self.response.raw).cast('B')
+        size = len(data)
+        pos = 0
+        names = []
+        while pos < size and data[pos] != isc_info_end:
+            name_end = pos + 4 + data[pos + 3]
+            names.append(bytes(data[pos + 4:name_end]))
+            pos = name_end
+        self.response.pos = pos
         # The client-exposed return value is a dictionary mapping
-        # username -> number of connections by that user.
+        # username -> number of connections by that user. Names are counted
+        # in C by Counter, and only distinct names are decoded.
         result = {}
-        for name in usernames:
-            result[name] = result.get(name, 0) + 1
+        for name, count in Counter(names).items():
+            name = name.decode(self._charset)
+            result[name] = result.get(name, 0) + count
         return result
-    def __tra_active(self) -> List:
+    def __tra_ids(self) -> List:
+        # Response contains one cluster per transaction (ACTIVE_TRANSACTIONS or LIMBO),
+        # so it's walked in single pass over the buffer instead of per-item buffer calls.
+        # Each cluster is: tag, 2-byte length, transaction ID.
+        data = memoryview(self.response.raw).cast('B')
+        size = len(data)
+        pos = self.response.pos
         result = []
-        while not self.response.is_eof():
-            self.response.get_tag()  # DbInfoCode.ACTIVE_TRANSACTIONS
-            result.append(self.response.read_sized_int())
-        return result
-    def __tra_limbo(self) -> List:
-        result = []
-        while not self.response.is_eof():
-            self.response.get_tag()  # DbInfoCode.LIMBO
-            result.append(self.response.read_sized_int())
+        while pos < size and data[pos] != isc_info_end:
+            value_end = pos + 3 + (data[pos + 1] | data[pos + 2] << 8)
+            result.append(int.from_bytes(data[pos + 3:value_end], 'little'))
+            pos = value_end
+        self.response.pos = pos
         return result
     def __crypt_state(self) -> EncryptionFlag:
         return EncryptionFlag(self.response.read_sized_int())
     def __con_state(self) -> ConnectionFlag:
         return ConnectionFlag(self.response.read_sized_int())
     def __tbl_perf_count(self) -> Dict[int, int]:
-        result = {}
-        clen = self.response.read_short()  # Cluster length
-        while clen > 0:
-            relation_id = self.response.read_short()
-            result[relation_id] = self.response.read_int()
-            clen -= 6
-        return result
+        return dict(_REL_COUNT.iter_unpack(self.response.read_bytes()))
     def __creation_date(self) -> datetime.datetime:
         value = self.response.read_bytes()
         return datetime.datetime.combine(_util.decode_date(value[:4]),
@@ -1292,21 +1634,36 @@ class DatabaseInfoProvider3(InfoProvider):
         Returns:
             The data type of returned value depends on information required.
         """
-        if info_code in self._cache:
-            return self._cache[info_code]
-        if info_code not in self._handlers:
+        if (result := self._cache.get(info_code, NOT_FOUND)) is not NOT_FOUND:
+            return result
+        if (handler := self._handlers.get(info_code)) is None:
             raise NotSupportedError(f"Info code {info_code} not supported by engine version {self.__engine_version}")
+        request = _BYTE[info_code]
+        if info_code in _DB_INFO_NUMBERS:
+            # Response is just tag, value length, value and isc_info_end, so it's read
+            # without buffer wipe, truncation handling and scan for end of data.
+            self._acquire(request)
+            self.response.rewind()
+            tag = self.response.get_tag()
+            if tag == info_code:
+                result = handler()
+                if self.response.get_tag() != isc_info_end:  # pragma: no cover
+                    raise InterfaceError("Invalid response format")
+                if info_code in _DB_INFO_CACHED:
+                    self._cache[info_code] = result
+                return result
+            raise InterfaceError("An error response was received" if tag == isc_info_error
+                                 else "Result code does not match request code")
         self.response.clear()
-        request = bytes([info_code])
         if info_code == DbInfoCode.PAGE_CONTENTS:
             request += (4).to_bytes(2, 'little')
             request += page_number.to_bytes(4, 'little')
             if len(self.response.raw) < self.page_size + 10:
-                self.response.resize(self.page_size + 10)
+                self.response.renew(self.page_size + 10)
         self._get_data(request)
         tag = self.response.get_tag()
         if request[0] != tag:
-            if info_code in (DbInfoCode.ACTIVE_TRANSACTIONS, DbInfoCode.LIMBO):
+            if info_code in _DB_INFO_TRA_LISTS:
                 # isc_info_active_transactions and isc_info_limbo with no transactions to
                 # report returns empty buffer and does not follow this rule
                 pass
@@ -1315,20 +1672,50 @@ class DatabaseInfoProvider3(InfoProvider):
             else:  # pragma: no cover
                 raise InterfaceError("Result code does not match request code")
         #
-        if info_code in (DbInfoCode.ACTIVE_TRANSACTIONS, DbInfoCode.LIMBO):
+        if info_code in _DB_INFO_TRA_LISTS:
             # we'll rewind back, otherwise it will break the repeating cluster processing
             self.response.rewind()
-        result = self._handlers[info_code]()
+        result = handler()
         # cache
-        if info_code in (DbInfoCode.CREATION_DATE, DbInfoCode.DB_CLASS, DbInfoCode.DB_PROVIDER,
-                         DbInfoCode.DB_SQL_DIALECT, DbInfoCode.ODS_MINOR_VERSION,
-                         DbInfoCode.ODS_VERSION, DbInfoCode.PAGE_SIZE, DbInfoCode.VERSION,
-                         DbInfoCode.FIREBIRD_VERSION, DbInfoCode.IMPLEMENTATION_OLD,
-                         DbInfoCode.IMPLEMENTATION, DbInfoCode.DB_ID, DbInfoCode.BASE_LEVEL,
-                         DbInfoCode.ATTACHMENT_ID):
+        if info_code in _DB_INFO_CACHED:
             self._cache[info_code] = result
         return result
     # Functions
+    def get_info_values(self, info_codes: Sequence[DbInfoCode]) -> Dict[DbInfoCode, Any]:
+        """Returns requested information from associated attachment.
+
+        Values for numeric info codes are requested together in single info request,
+        other information is obtained via `get_info()`.
+
+        Arguments:
+            info_codes: Codes specifying the required information.
+
+        Returns:
+            Dictionary with info codes as keys and returned information as values.
+        """
+        values = {}
+        request = []
+        for info_code in info_codes:
+            if (result := self._cache.get(info_code, NOT_FOUND)) is not NOT_FOUND:
+                values[info_code] = result
+            elif info_code not in self._handlers:
+                raise NotSupportedError(f"Info code {info_code} not supported by engine version {self.__engine_version}")
+            elif info_code in _DB_INFO_NUMBERS:
+                request.append(info_code)
+            else:
+                values[info_code] = self.get_info(info_code)
+        if request:
+            self.response.clear()
+            self._get_data(bytes(request))
+            while not self.response.is_eof():
+                if (tag := self.response.get_tag()) not in request:
+                    if tag == isc_info_error:  # pragma: no cover
+                        raise InterfaceError("An error response was received")
+                    raise InterfaceError("Result code does not match request code") # pragma: no cover
+                values[tag] = result = self.response.read_sized_int()
+                if tag in _DB_INFO_CACHED:
+                    self._cache[tag] = result
+        return {info_code: values[info_code] for info_code in info_codes}
     def get_page_content(self, page_number: int) -> bytes:
         """Returns content of single database page.
 
@@ -1347,19 +1734,30 @@ class DatabaseInfoProvider3(InfoProvider):
     def get_table_access_stats(self) -> List[TableAccessStats]:
         """Returns actual table access statistics.
         """
-        tables = {}
-        info_codes = [DbInfoCode.READ_SEQ_COUNT, DbInfoCode.READ_IDX_COUNT,
-                      DbInfoCode.INSERT_COUNT, DbInfoCode.UPDATE_COUNT,
-                      DbInfoCode.DELETE_COUNT, DbInfoCode.BACKOUT_COUNT,
-                      DbInfoCode.PURGE_COUNT, DbInfoCode.EXPUNGE_COUNT]
-        #stats = self.get_info(info_codes)
-        for info_code in info_codes:
-            stat: Mapping = self.get_info(info_code)
+        # All counters are requested at once, unless the response does not fit into
+        # the info buffer. Then they are requested one by one.
+        self.response.clear()
+        try:
+            self._get_data(_TABLE_STATS_REQUEST)
+        except InterfaceError:
+            stats = [(pos, self.get_info(info_code)) for info_code, pos in _TABLE_STATS_POS.items()]
+        else:
+            stats = []
+            while not self.response.is_eof():
+                if (pos := _TABLE_STATS_POS.get(tag := self.response.get_tag())) is None:
+                    if tag == isc_info_error:  # pragma: no cover
+                        raise InterfaceError("An error response was received")
+                    raise InterfaceError("Result code does not match request code") # pragma: no cover
+                stats.append((pos, self.__tbl_perf_count()))
+        # Counts are collected by position of TableAccessStats fields and passed as
+        # positional arguments, missing counts are None (like field defaults)
+        tables: Dict[int, List[int]] = {}
+        for pos, stat in stats:
             for table, count in stat.items():
-                tables.setdefault(table, dict.fromkeys(info_codes))[info_code] = count
-        return [TableAccessStats(table, **{_i2name[code]:count
-                                           for code, count in tables[table].items()})
-                for table in tables] # pylint: disable=C0206
+                if (counts := tables.get(table)) is None:
+                    counts = tables[table] = [None] * len(_TABLE_STATS_CODES)
+                counts[pos] = count
+        return [TableAccessStats(table, *counts) for table, counts in tables.items()]
     def is_compressed(self) -> bool:
         """Returns True if connection to the server uses data compression.
         """
@@ -1369,7 +1767,7 @@ class DatabaseInfoProvider3(InfoProvider):
         """
         return ConnectionFlag.ENCRYPTED in ConnectionFlag(self.get_info(DbInfoCode.CONN_FLAGS))
     # Properties
-    @property
+    @cached_property
     def id(self) -> int:
         """Attachment ID.
         """
@@ -1388,62 +1786,62 @@ class DatabaseInfoProvider3(InfoProvider):
         """Page size (in bytes).
         """
         return self.__page_size
-    @property
+    @cached_property
     def sql_dialect(self) -> int:
         """SQL dialect used by connected database.
         """
         return self.get_info(DbInfoCode.DB_SQL_DIALECT)
-    @property
+    @cached_property
     def name(self) -> str:
         """Database name (filename or alias).
         """
         return self.get_info(DbInfoCode.DB_ID)[0]
-    @property
+    @cached_property
     def site(self) -> str:
         """Database site name.
         """
         return self.get_info(DbInfoCode.DB_ID)[1]
-    @property
+    @cached_property
     def server_version(self) -> str:
         """Firebird server version (compatible with InterBase version).
         """
         return self.get_info(DbInfoCode.VERSION)
-    @property
+    @cached_property
     def firebird_version(self) -> str:
         """Firebird server version.
         """
         return self.get_info(DbInfoCode.FIREBIRD_VERSION)
-    @property
+    @cached_property
     def implementation(self) -> tuple[ImpData]:
         """Implementation (new format).
         """
         return self.get_info(DbInfoCode.IMPLEMENTATION)
-    @property
+    @cached_property
     def provider(self) -> DbProvider:
         """Database Provider.
         """
         return DbProvider(self.get_info(DbInfoCode.DB_PROVIDER))
-    @property
+    @cached_property
     def db_class(self) -> DbClass:
         """Database Class.
         """
         return DbClass(self.get_info(DbInfoCode.DB_CLASS))
-    @property
+    @cached_property
     def creation_date(self) -> datetime.date:
         """Date when database was created.
         """
         return self.get_info(DbInfoCode.CREATION_DATE)
-    @property
+    @cached_property
     def ods(self) -> float:
         """Database On-Disk Structure version (<major>.<minor>).
         """
         return float(f'{self.ods_version}.{self.ods_minor_version}')
-    @property
+    @cached_property
     def ods_version(self) -> int:
         """Database On-Disk Structure MAJOR version.
         """
         return self.get_info(DbInfoCode.ODS_VERSION)
-    @property
+    @cached_property
     def ods_minor_version(self) -> int:
         """Database On-Disk Structure MINOR version.
         """
@@ -1474,6 +1872,11 @@ class DatabaseInfoProvider3(InfoProvider):
         """
         return self.get_info(DbInfoCode.PAGES_FREE)
     @property
+    def page_stats(self) -> PageStats:
+        """Database page statistics (obtained with single info request).
+        """
+        return PageStats(*self.get_info_values(_DB_INFO_PAGE_STATS).values())
+    @property
     def sweep_interval(self) -> int:
         """Sweep interval.
         """
@@ -1549,6 +1952,12 @@ class DatabaseInfoProvider3(InfoProvider):
         """
         return self.get_info(DbInfoCode.NEXT_TRANSACTION)
     @property
+    def transaction_stats(self) -> TransactionStats:
+        """Transaction counters OIT, OAT, OST and next transaction ID (obtained with
+        single info request).
+        """
+        return TransactionStats(*self.get_info_values(_DB_INFO_TRA_STATS).values())
+    @property
     def version(self) -> str:
         """Firebird version as SEMVER string.
         """
@@ -1612,6 +2021,33 @@ class DatabaseInfoProvider(DatabaseInfoProvider3):
     def set_statement_timeout(self, value: int) -> None:
         self._con()._att.set_statement_timeout(value)
 
+#: Precision of table column
+_SQL_FIELD_PRECISION = ("SELECT FIELD_SPEC.RDB$FIELD_PRECISION"
+                        " FROM RDB$FIELDS FIELD_SPEC,"
+                        " RDB$RELATION_FIELDS REL_FIELDS"
+                        " WHERE"
+                        " FIELD_SPEC.RDB$FIELD_NAME ="
+                        " REL_FIELDS.RDB$FIELD_SOURCE"
+                        " AND REL_FIELDS.RDB$RELATION_NAME = ?"
+                        " AND REL_FIELDS.RDB$FIELD_NAME = ?")
+#: Precision of stored procedure output parameter
+_SQL_PARAM_PRECISION = ("SELECT FIELD_SPEC.RDB$FIELD_PRECISION"
+                        " FROM RDB$FIELDS FIELD_SPEC,"
+                        " RDB$PROCEDURE_PARAMETERS REL_FIELDS"
+                        " WHERE"
+                        " FIELD_SPEC.RDB$FIELD_NAME ="
+                        " REL_FIELDS.RDB$FIELD_SOURCE"
+                        " AND RDB$PROCEDURE_NAME = ?"
+                        " AND RDB$PARAMETER_NAME = ?"
+                        " AND RDB$PARAMETER_TYPE = 1")
+#: Subtype of array column
+_SQL_FIELD_SUBTYPE = ("SELECT FIELD_SPEC.RDB$FIELD_SUB_TYPE"
+                      " FROM RDB$FIELDS FIELD_SPEC, RDB$RELATION_FIELDS REL_FIELDS"
+                      " WHERE"
+                      " FIELD_SPEC.RDB$FIELD_NAME = REL_FIELDS.RDB$FIELD_SOURCE"
+                      " AND REL_FIELDS.RDB$RELATION_NAME = ?"
+                      " AND REL_FIELDS.RDB$FIELD_NAME = ?")
+
 class Connection(LoggingIdMixin):
     """Connection to the database.
 
@@ -1637,6 +2073,7 @@ class Connection(LoggingIdMixin):
         self.__charset: str = charset
         self.__precision_cache = {}
         self.__sqlsubtype_cache = {}
+        self.__internal_statements: Dict[str, Statement] = {}
         self.__ecollectors: List[EventCollector] = []
         self.__dsn: str = dsn
         self.__sql_dialect: int = sql_dialect
@@ -1646,7 +2083,7 @@ class Connection(LoggingIdMixin):
         #: Default TPB for newly created transaction managers
         self.default_tpb: bytes = tpb(Isolation.SNAPSHOT)
         self._transactions: List[TransactionManager] = []
-        self._statements: List[Statement] = []
+        self._statements: Set[Statement] = weakref.WeakSet()
         #
         self.__ev: float = None
         self.__info: DatabaseInfoProvider = None
@@ -1680,14 +2117,12 @@ class Connection(LoggingIdMixin):
         if self.__handle is None:
             isc_status = a.ISC_STATUS_ARRAY()
             self.__handle = a.FB_API_HANDLE(0)
-            a.get_api().fb_get_database_handle(isc_status, self.__handle, self._att)
+            a.api.fb_get_database_handle(isc_status, self.__handle, self._att)
             if a.db_api_error(isc_status):  # pragma: no cover
                 raise a.exception_from_status(DatabaseError,
                                               isc_status,
                                               "Error in Connection._get_handle:fb_get_database_handle()")
         return self.__handle
-    def __stmt_deleted(self, stmt) -> None:
-        self._statements.remove(stmt)
     def _close(self) -> None:
         if self.__schema is not None:
             self.__schema._set_internal(False)
@@ -1704,10 +2139,10 @@ class Connection(LoggingIdMixin):
             tra = self._transactions.pop(0)
             tra.default_action = DefaultAction.ROLLBACK  # Required by Python DB API 2.0
             tra.close()
-        while self._statements:
-            s = self._statements.pop()()
-            if s is not None:
-                s.free()
+        for stmt in list(self._statements):
+            stmt.free()
+        self._statements.clear()
+        self.__internal_statements.clear()
     def _close_internals(self) -> None:
         self.main_transaction.close()
         self.query_transaction.close()
@@ -1722,10 +2157,16 @@ class Connection(LoggingIdMixin):
             tra.begin()
         stmt = self._att.prepare(tra._tra, sql, self.__sql_dialect)
         result = Statement(self, stmt, sql, self.__sql_dialect)
-        self._statements.append(weakref.ref(result, self.__stmt_deleted))
+        self._statements.add(result)
         if _commit:
             tra.commit()
         return result
+    def _internal_statement(self, sql: str) -> Statement:
+        # Metadata lookups executed by internal cursor are prepared only once, and the
+        # statements are released with other connection statements on close.
+        if (stmt := self.__internal_statements.get(sql)) is None:
+            stmt = self.__internal_statements[sql] = self._prepare(sql, self._tra_qry)
+        return stmt
     def _determine_field_precision(self, meta: ItemMetadata) -> int:
         if (not meta.relation) or (not meta.field):
             # Either or both field name and relation name are not provided,
@@ -1735,56 +2176,35 @@ class Connection(LoggingIdMixin):
         # Special case for automatic RDB$DB_KEY fields.
         if meta.field in ('DB_KEY', 'RDB$DB_KEY'):
             return 0
-        precision = self.__precision_cache.get((meta.relation, meta.field))
-        if precision is not None:
+        key = (meta.relation, meta.field)
+        # Fields without precision are cached as well, as 0
+        precision = self.__precision_cache.get(key, NOT_FOUND)
+        if precision is not NOT_FOUND:
             return precision
         # First, try table
         with transaction(self._tra_qry, bypass=True):
-            with self._ic.execute("SELECT FIELD_SPEC.RDB$FIELD_PRECISION"
-                                   " FROM RDB$FIELDS FIELD_SPEC,"
-                                   " RDB$RELATION_FIELDS REL_FIELDS"
-                                   " WHERE"
-                                   " FIELD_SPEC.RDB$FIELD_NAME ="
-                                   " REL_FIELDS.RDB$FIELD_SOURCE"
-                                   " AND REL_FIELDS.RDB$RELATION_NAME = ?"
-                                   " AND REL_FIELDS.RDB$FIELD_NAME = ?",
-                                   (meta.relation, meta.field)):
+            with self._ic.execute(self._internal_statement(_SQL_FIELD_PRECISION), key):
                 result = self._ic.fetchone()
             if result is None:
                 # Next, try stored procedure output parameter
-                with self._ic.execute("SELECT FIELD_SPEC.RDB$FIELD_PRECISION"
-                                       " FROM RDB$FIELDS FIELD_SPEC,"
-                                       " RDB$PROCEDURE_PARAMETERS REL_FIELDS"
-                                       " WHERE"
-                                       " FIELD_SPEC.RDB$FIELD_NAME ="
-                                       " REL_FIELDS.RDB$FIELD_SOURCE"
-                                       " AND RDB$PROCEDURE_NAME = ?"
-                                       " AND RDB$PARAMETER_NAME = ?"
-                                       " AND RDB$PARAMETER_TYPE = 1",
-                                       (meta.relation, meta.field)):
+                with self._ic.execute(self._internal_statement(_SQL_PARAM_PRECISION), key):
                     result = self._ic.fetchone()
-            if result:
-                self.__precision_cache[(meta.relation, meta.field)] = result[0]
-                return result[0]
-        # We ran out of options
-        return 0
+        # If we ran out of options, precision is 0
+        precision = result[0] if result else 0
+        self.__precision_cache[key] = precision
+        return precision
     def _get_array_sqlsubtype(self, relation: bytes, column: bytes) -> Optional[int]:
-        subtype = self.__sqlsubtype_cache.get((relation, column))
-        if subtype is not None:
+        key = (relation, column)
+        # Unknown columns are cached as well, as None
+        subtype = self.__sqlsubtype_cache.get(key, NOT_FOUND)
+        if subtype is not NOT_FOUND:
             return subtype
         with transaction(self._tra_qry, bypass=True):
-            with self._ic.execute("SELECT FIELD_SPEC.RDB$FIELD_SUB_TYPE"
-                                   " FROM RDB$FIELDS FIELD_SPEC, RDB$RELATION_FIELDS REL_FIELDS"
-                                   " WHERE"
-                                   " FIELD_SPEC.RDB$FIELD_NAME = REL_FIELDS.RDB$FIELD_SOURCE"
-                                   " AND REL_FIELDS.RDB$RELATION_NAME = ?"
-                                   " AND REL_FIELDS.RDB$FIELD_NAME = ?",
-                                   (relation, column)):
+            with self._ic.execute(self._internal_statement(_SQL_FIELD_SUBTYPE), key):
                 result = self._ic.fetchone()
-        if result:
-            self.__sqlsubtype_cache[(relation, column)] = result[0]
-            return result[0]
-        return None
+        subtype = result[0] if result else None
+        self.__sqlsubtype_cache[key] = subtype
+        return subtype
     def drop_database(self) -> None:
         """Drops the connected database.
 
@@ -2012,6 +2432,7 @@ class Connection(LoggingIdMixin):
             self.__monitor._set_internal(True)
         return self.__monitor
 
+@lru_cache(maxsize=32)
 def tpb(isolation: Isolation, lock_timeout: int=-1, access_mode: TraAccessMode=TraAccessMode.WRITE) -> bytes:
     """Helper function to costruct simple TPB.
 
@@ -2019,9 +2440,16 @@ def tpb(isolation: Isolation, lock_timeout: int=-1, access_mode: TraAccessMode=T
         isolation: Isolation level.
         lock_timeout: Lock timeout (-1 = Infinity)
         access: Access mode.
+
+    Note:
+        Built buffers are cached, so repeated calls with the same arguments return
+        the same `bytes` object.
     """
     return TPB(isolation=isolation, lock_timeout=lock_timeout, access_mode=access_mode).get_buffer()
 
+#: Connection string prefixes for network protocols
+_PROTOCOL_PREFIX = {protocol: f'{protocol.name.lower()}://' for protocol in NetProtocol}
+
 def _connect_helper(dsn: str, host: str, port: str, database: str, protocol: NetProtocol) -> str:
     if ((not dsn and not host and not database) or # pylint: disable=R0916
             (dsn and (host or database)) or
@@ -2033,29 +2461,30 @@ def _connect_helper(dsn: str, host: str, port: str, database: str, protocol: Net
                              " 3. only keyword argument database='/path/to/database'")
     if not dsn:
         if protocol is not None:
-            dsn = f'{protocol.name.lower()}://'
+            prefix = _PROTOCOL_PREFIX[protocol]
             if host and port:
-                dsn += f'{host}:{port}/'
+                dsn = f'{prefix}{host}:{port}/{database}'
             elif host:
-                dsn += f'{host}/'
+                dsn = f'{prefix}{host}/{database}'
+            else:
+                dsn = f'{prefix}{database}'
+        elif host and host.startswith('\\\\'): # Windows Named Pipes
+            if port:
+                dsn = f'{host}@{port}\\{database}'
+            else:
+                dsn = f'{host}\\{database}'
+        elif host and port:
+            dsn = f'{host}/{port}:{database}'
+        elif host:
+            dsn = f'{host}:{database}'
         else:
-            dsn = ''
-            if host and host.startswith('\\\\'): # Windows Named Pipes
-                if port:
-                    dsn += f'{host}@{port}\\'
-                else:
-                    dsn += f'{host}\\'
-            elif host and port:
-                dsn += f'{host}/{port}:'
-            elif host:
-                dsn += f'{host}:'
-        dsn += database
+            dsn = database
     return dsn
 
 def __make_connection(create: bool, dsn: str, utf8filename: bool, dpb: bytes,
                       sql_dialect: int, charset: str,
                       crypt_callback: iCryptKeyCallbackImpl) -> Connection:
-    with a.get_api().master.get_dispatcher() as provider:
+    with _get_master().get_dispatcher() as provider:
         if crypt_callback is not None:
             provider.set_dbcrypt_callback(crypt_callback)
         if create:
@@ -2250,6 +2679,9 @@ class TransactionInfoProvider3(InfoProvider):
        Do NOT create instances of this class directly! Use `TransactionManager.info`
        property to access the instance already bound to transaction context.
     """
+    # Transaction info providers are short-lived, so they start with buffer size
+    # learned by previous instances.
+    _size_hints: Dict[bytes, int] = {}
     def __init__(self, charset: str, tra: TransactionManager):
         super().__init__(charset)
         self._mngr: TransactionManager = weakref.ref(tra)
@@ -2292,16 +2724,16 @@ class TransactionInfoProvider3(InfoProvider):
         """Returns response for transaction INFO request. The type and content of returned
         value(s) depend on INFO code passed as parameter.
         """
-        if info_code not in self._handlers:
+        if (handler := self._handlers.get(info_code)) is None:
             raise NotSupportedError(f"Info code {info_code} not supported by engine version {self._mngr()._connection()._engine_version()}")
-        request = bytes([info_code])
+        request = _BYTE[info_code]
         self._get_data(request)
         tag = self.response.get_tag()
         if request[0] != tag:
             raise InterfaceError("An error response was received" if tag == isc_info_error
                                  else "Result code does not match request code")
         #
-        return self._handlers[info_code]()
+        return handler()
     # Functions
     def is_read_only(self) -> bool:
         """Returns True if transaction is Read Only.
@@ -2383,7 +2815,7 @@ class TransactionManager(LoggingIdMixin):
         self.default_action: DefaultAction = default_action
         self.__handle: a.FB_API_HANDLE = None
         self.__info: Union[TransactionInfoProvider, TransactionInfoProvider3] = None
-        self._cursors: List = []  # Weak references to cursors
+        self._cursors: Set[Cursor] = weakref.WeakSet()
         self._tra: iTransaction = None
         self.__closed: bool = False
         self._logging_id_ = 'Transaction'
@@ -2399,12 +2831,8 @@ class TransactionManager(LoggingIdMixin):
     def __dead_con(self, obj) -> None: # pylint: disable=W0613
         self._connection = None
     def _close_cursors(self) -> None:
-        for cursor in self._cursors:
-            c = cursor()
-            if c:
-                c.close()
-    def _cursor_deleted(self, obj) -> None:
-        self._cursors.remove(obj)
+        for cursor in list(self._cursors):
+            cursor.close()
     def _finish(self, default_action: DefaultAction=None) -> None:
         try:
             if self._tra is not None:
@@ -2421,7 +2849,7 @@ class TransactionManager(LoggingIdMixin):
         if self.__handle is None:
             isc_status = a.ISC_STATUS_ARRAY()
             self.__handle = a.FB_API_HANDLE(0)
-            a.get_api().fb_get_transaction_handle(isc_status, self.__handle, self._tra)
+            a.api.fb_get_transaction_handle(isc_status, self.__handle, self._tra)
             if a.db_api_error(isc_status):  # pragma: no cover
                 raise a.exception_from_status(DatabaseError,
                                               isc_status,
@@ -2516,7 +2944,7 @@ class TransactionManager(LoggingIdMixin):
         """
         assert not self.__closed
         cur = Cursor(self._connection(), self)
-        self._cursors.append(weakref.ref(cur, self._cursor_deleted))
+        self._cursors.add(cur)
         return cur
     def is_active(self) -> bool:
         """Returns True if transaction is active.
@@ -2546,7 +2974,7 @@ class TransactionManager(LoggingIdMixin):
     def cursors(self) -> List[Cursor]:
         """Cursors associated with this transaction.
         """
-        return [x() for x in self._cursors]
+        return list(self._cursors)
 
 class DistributedTransactionManager(TransactionManager):
     """Manages distributed transaction over multiple connections that use two-phase
@@ -2560,7 +2988,7 @@ class DistributedTransactionManager(TransactionManager):
         self._connections: List[Connection] = list(connections)
         self.default_tpb: bytes = default_tpb if default_tpb is not None else tpb(Isolation.SNAPSHOT)
         self.default_action: DefaultAction = default_action
-        self._cursors: List = []  # Weak references to cursors
+        self._cursors: Set[Cursor] = weakref.WeakSet()
         self._tra: iTransaction = None
         self._dtc: iDtc = _master.get_dtc()
         self.__closed: bool = False
@@ -2672,7 +3100,7 @@ class DistributedTransactionManager(TransactionManager):
             raise InterfaceError("Cannot create cursor for connection that does "
                                  "not belong to this distributed transaction")
         cur = Cursor(connection, self)
-        self._cursors.append(weakref.ref(cur, self._cursor_deleted))
+        self._cursors.add(cur)
         return cur
 
     @property
@@ -2729,16 +3157,16 @@ class StatementInfoProvider3(InfoProvider):
         """Returns response for statement INFO request. The type and content of returned
         value(s) depend on INFO code passed as parameter.
         """
-        if info_code not in self._handlers:
+        if (handler := self._handlers.get(info_code)) is None:
             raise NotSupportedError(f"Info code {info_code} not supported by engine version {self._stmt()._connection()._engine_version()}")
-        request = bytes([info_code])
+        request = _BYTE[info_code]
         self._get_data(request)
         tag = self.response.get_tag()
         if request[0] != tag:
             raise InterfaceError("An error response was received" if tag == isc_info_error
                                  else "Result code does not match request code")
         #
-        return self._handlers[info_code]()
+        return handler()
 
 class StatementInfoProvider(StatementInfoProvider3):
     """Provides access to information about statement [Firebird 4+].
@@ -2924,7 +3352,7 @@ class BlobReader(io.IOBase, LoggingIdMixin):
     def __iter__(self):
         return self
     def __reset_buffer(self) -> None:
-        memset(self.__buf, 0, self._segment_size)
+        # Buffer content is not cleared, as data are never read past `__buf_data`
         self.__buf_pos = 0
         self.__buf_data = 0
     def __blob_get(self) -> None:
@@ -2968,9 +3396,8 @@ class BlobReader(io.IOBase, LoggingIdMixin):
             to_read = min(size, self._blob_length - self.__pos)
         else:
             to_read = self._blob_length - self.__pos
-        return_size = to_read
-        result: bytes = create_string_buffer(return_size)
-        pos = 0
+        # Data are copied from segment buffer straight to bytes chunks
+        chunks = []
         while to_read > 0:
             to_copy = min(to_read, self.__buf_data - self.__buf_pos)
             if to_copy == 0:
@@ -2979,12 +3406,11 @@ class BlobReader(io.IOBase, LoggingIdMixin):
                 if to_copy == 0:
                     # BLOB EOF
                     break
-            memmove(byref(result, pos), byref(self.__buf, self.__buf_pos), to_copy)
-            pos += to_copy
+            chunks.append(string_at(byref(self.__buf, self.__buf_pos), to_copy))
             self.__pos += to_copy
             self.__buf_pos += to_copy
             to_read -= to_copy
-        result = result.raw[:return_size]
+        result = chunks[0] if len(chunks) == 1 else b''.join(chunks)
         if self.sub_type == 1:
             result = result.decode(self._charset)
         return result
@@ -3013,14 +3439,14 @@ class BlobReader(io.IOBase, LoggingIdMixin):
                 if to_scan == 0:
                     # BLOB EOF
                     break
-            pos = 0
-            while pos < to_scan:
-                if self.__buf[self.__buf_pos+pos] == b'\n':
-                    found = True
-                    pos += 1
-                    break
+            chunk = string_at(byref(self.__buf, self.__buf_pos), to_scan)
+            if (pos := chunk.find(b'\n')) >= 0:
+                found = True
                 pos += 1
-            line.append(string_at(byref(self.__buf, self.__buf_pos), pos).decode(self._charset))
+                chunk = chunk[:pos]
+            else:
+                pos = to_scan
+            line.append(chunk.decode(self._charset))
             self.__buf_pos += pos
             self.__pos += pos
             to_read -= pos
@@ -3181,15 +3607,15 @@ class Cursor(LoggingIdMixin):
                     if subtype != a.OCTETS:
                         val = val.decode(self._encoding)
                 elif dtype in (a.blr_short, a.blr_long, a.blr_int64):
-                    val = (0).from_bytes(buf[bufpos:bufpos + esize], 'little', signed=True)
+                    val = _INT_UNPACKERS[esize](buf, bufpos)[0]
                     if subtype or scale:
                         val = decimal.Decimal(val) / _tenTo[abs(scale)]
                 elif dtype == a.blr_bool:
                     val = (0).from_bytes(buf[bufpos:bufpos + esize], 'little') == 1
                 elif dtype == a.blr_float:
-                    val = struct.unpack('f', buf[bufpos:bufpos+esize])[0]
+                    val = _unpack_float(buf, bufpos)[0]
                 elif dtype in (a.blr_d_float, a.blr_double):
-                    val = struct.unpack('d', buf[bufpos:bufpos+esize])[0]
+                    val = _unpack_double(buf, bufpos)[0]
                 elif dtype == a.blr_timestamp:
                     val = datetime.datetime.combine(_util.decode_date(buf[bufpos:bufpos+4]),
                                                     _util.decode_time(buf[bufpos+4:bufpos+esize]))
@@ -3224,9 +3650,9 @@ class Cursor(LoggingIdMixin):
                                value: Any, buf: Any, bufpos: int) -> None:
         valuebuf = None
         if dtype in (a.blr_text, a.blr_text2):
-            valuebuf = create_string_buffer(bytes([0]), esize)
+            valuebuf = create_string_buffer(esize)
         elif dtype in (a.blr_varying, a.blr_varying2):
-            valuebuf = create_string_buffer(bytes([0]), esize)
+            valuebuf = create_string_buffer(esize)
         elif dtype in (a.blr_short, a.blr_long, a.blr_int64):
             if esize == 2:
                 valuebuf = a.ISC_SHORT(0)
@@ -3237,21 +3663,21 @@ class Cursor(LoggingIdMixin):
             else:  # pragma: no cover
                 raise InterfaceError("Unsupported number type")
         elif dtype == a.blr_float:
-            valuebuf = create_string_buffer(bytes([0]), esize)
+            valuebuf = create_string_buffer(esize)
         elif dtype in (a.blr_d_float, a.blr_double):
-            valuebuf = create_string_buffer(bytes([0]), esize)
+            valuebuf = create_string_buffer(esize)
         elif dtype == a.blr_timestamp:
-            valuebuf = create_string_buffer(bytes([0]), esize)
+            valuebuf = create_string_buffer(esize)
         elif dtype == a.blr_sql_date:
-            valuebuf = create_string_buffer(bytes([0]), esize)
+            valuebuf = create_string_buffer(esize)
         elif dtype == a.blr_sql_time:
-            valuebuf = create_string_buffer(bytes([0]), esize)
+            valuebuf = create_string_buffer(esize)
         elif dtype == a.blr_bool:
-            valuebuf = create_string_buffer(bytes([0]), esize)
+            valuebuf = create_string_buffer(esize)
         elif dtype in (a.blr_int128, a.blr_dec64, a.blr_dec128):
-            valuebuf = create_string_buffer(bytes([0]), esize)
+            valuebuf = create_string_buffer(esize)
         elif dtype in (a.blr_sql_time_tz, a.blr_timestamp_tz):
-            valuebuf = create_string_buffer(bytes([0]), esize)
+            valuebuf = create_string_buffer(esize)
         else:  # pragma: no cover
             raise InterfaceError(f"Unsupported Firebird ARRAY subtype: {dtype}")
         self._fill_db_array_buffer(esize, dtype,
@@ -3299,7 +3725,7 @@ class Cursor(LoggingIdMixin):
                                    byref(valuebuf),
                                    esize)
                 elif dtype == a.blr_bool:
-                    valuebuf.value = (1 if value[i] else 0).to_bytes(1, 'little')
+                    valuebuf.value = _BYTE[1 if value[i] else 0]
                     memmove(byref(buf, bufpos),
                                    byref(valuebuf),
                                    esize)
@@ -3313,10 +3739,10 @@ class Cursor(LoggingIdMixin):
                     valuebuf.value = _encode_timestamp(value[i])
                     memmove(byref(buf, bufpos), valuebuf, esize)
                 elif dtype == a.blr_sql_date:
-                    valuebuf.value = _util.encode_date(value[i]).to_bytes(4, 'little')
+                    valuebuf.value = _encode_date(value[i]).to_bytes(4, 'little')
                     memmove(byref(buf, bufpos), valuebuf, esize)
                 elif dtype == a.blr_sql_time:
-                    valuebuf.value = _util.encode_time(value[i]).to_bytes(4, 'little')
+                    valuebuf.value = _encode_time(value[i]).to_bytes(4, 'little')
                     memmove(byref(buf, bufpos), valuebuf, esize)
                 elif dtype == a.blr_sql_time_tz:
                     valuebuf.value = _util.encode_time_tz(value[i])
@@ -3422,12 +3848,12 @@ class Cursor(LoggingIdMixin):
                         value = str(value)
                     if isinstance(value, str) and self._encoding:
                         value = value.encode(self._encoding)
-                    if (datatype in (SQLDataType.TEXT, SQLDataType.VARYING)
+                    if (datatype in _TEXT_TYPES
                         and len(value) > length):
                         raise ValueError(f"Value of parameter ({i}) is too long,"
                                          f" expected {length}, found {len(value)}")
                     memmove(buf_addr + offset, value, len(value))
-                elif datatype in (SQLDataType.SHORT, SQLDataType.LONG, SQLDataType.INT64):
+                elif datatype in _FIXED_INT_TYPES:
                     # It's scalled integer?
                     scale = in_meta.get_scale(i)
                     if in_meta.get_subtype(i) or scale:
@@ -3441,11 +3867,11 @@ class Cursor(LoggingIdMixin):
                                             f' a fixed-point column.')
                     _check_integer_range(value, self._dialect, datatype,
                                          in_meta.get_subtype(i), scale)
-                    memmove(buf_addr + offset, value.to_bytes(length, 'little', signed=True), length)
+                    _INT_PACKERS[length](in_buffer, offset, value)
                 elif datatype == SQLDataType.DATE:
-                    memmove(buf_addr + offset, _util.encode_date(value).to_bytes(length, 'little', signed=True), length)
+                    _INT_PACKERS[length](in_buffer, offset, _encode_date(value))
                 elif datatype == SQLDataType.TIME:
-                    memmove(buf_addr + offset, _util.encode_time(value).to_bytes(length, 'little'), length)
+                    _pack_uint32(in_buffer, offset, _encode_time(value))
                 elif datatype == SQLDataType.TIME_TZ:
                     memmove(buf_addr + offset, _util.encode_time_tz(value), length)
                 elif datatype == SQLDataType.TIMESTAMP:
@@ -3459,11 +3885,11 @@ class Cursor(LoggingIdMixin):
                 elif datatype == SQLDataType.INT128:
                     memmove(buf_addr + offset, _util.get_int128().from_str(str(value), in_meta.get_scale(i)), length)
                 elif datatype == SQLDataType.FLOAT:
-                    memmove(buf_addr + offset, struct.pack('f', value), length)
+                    _pack_float(in_buffer, offset, value)
                 elif datatype == SQLDataType.DOUBLE:
-                    memmove(buf_addr + offset, struct.pack('d', value), length)
+                    _pack_double(in_buffer, offset, value)
                 elif datatype == SQLDataType.BOOLEAN:
-                    memmove(buf_addr + offset, (1 if value else 0).to_bytes(length, 'little'), length)
+                    in_buffer[offset] = 1 if value else 0
                 elif datatype == SQLDataType.BLOB:
                     blobid = a.ISC_QUAD(0, 0)
                     if hasattr(value, 'read'):
@@ -3474,9 +3900,10 @@ class Cursor(LoggingIdMixin):
                         try:
                             memmove(buf_addr + offset, addressof(blobid), length)
                             while value_chunk := value.read(MAX_BLOB_SEGMENT_SIZE):
-                                blob_buf.raw = value_chunk.encode(self._encoding) if isinstance(value_chunk, str) else value_chunk
+                                if isinstance(value_chunk, str):
+                                    value_chunk = value_chunk.encode(self._encoding)
+                                blob_buf.raw = value_chunk
                                 blob.put_segment(len(value_chunk), blob_buf)
-                                memset(blob_buf, 0, MAX_BLOB_SEGMENT_SIZE)
                         finally:
                             blob.close()
                             del blob_buf
@@ -3515,7 +3942,7 @@ class Cursor(LoggingIdMixin):
                     tr_handle = self._transaction._get_handle()
                     relname = in_meta.get_relation(i).encode(self._encoding)
                     sqlname = in_meta.get_field(i).encode(self._encoding)
-                    api = a.get_api()
+                    api = a.api
                     sqlsubtype = self._connection._get_array_sqlsubtype(relname, sqlname)
                     api.isc_array_lookup_bounds(isc_status, db_handle, tr_handle,
                                                 relname, sqlname, arraydesc)
@@ -3582,14 +4009,14 @@ class Cursor(LoggingIdMixin):
                         reallength = length
                     value = value[:reallength]
                 elif datatype == SQLDataType.VARYING:
-                    size = (0).from_bytes(string_at(buf_addr + offset, 2), 'little')
+                    size = _unpack_uint16(buffer, offset)[0]
                     value = string_at(buf_addr + offset + 2, size)
                     if desc.charset != 1:
                         value = value.decode(self._encoding)
                 elif datatype == SQLDataType.BOOLEAN:
-                    value = bool((0).from_bytes(buffer[offset], 'little'))
-                elif datatype in (SQLDataType.SHORT, SQLDataType.LONG, SQLDataType.INT64):
-                    value = (0).from_bytes(buffer[offset:offset + length], 'little', signed=True)
+                    value = buffer[offset] != _BYTE[0]
+                elif datatype in _FIXED_INT_TYPES:
+                    value = _INT_UNPACKERS[length](buffer, offset)[0]
                     # It's scalled integer?
                     if desc.subtype or desc.scale:
                         value = decimal.Decimal(value) / _tenTo[abs(desc.scale)]
@@ -3611,13 +4038,11 @@ class Cursor(LoggingIdMixin):
                 elif datatype == SQLDataType.DEC34:
                     value = decimal.Decimal(_util.get_decfloat34().to_str(a.FB_DEC34.from_buffer_copy(buffer[offset:offset+length])))
                 elif datatype == SQLDataType.FLOAT:
-                    value = struct.unpack('f', buffer[offset:offset+length])[0]
+                    value = _unpack_float(buffer, offset)[0]
                 elif datatype == SQLDataType.DOUBLE:
-                    value = struct.unpack('d', buffer[offset:offset+length])[0]
+                    value = _unpack_double(buffer, offset)[0]
                 elif datatype == SQLDataType.BLOB:
-                    val = buffer[offset:offset+length]
-                    blobid = a.ISC_QUAD((0).from_bytes(val[:4], 'little'),
-                                        (0).from_bytes(val[4:], 'little'))
+                    blobid = a.ISC_QUAD.from_buffer_copy(buffer, offset)
                     blob = self._connection._att.open_blob(self._transaction._tra, blobid, _bpb_stream)
                     # Get BLOB total length and max. size of segment
                     blob_length = blob.get_info2(BlobInfoCode.TOTAL_LENGTH)
@@ -3650,16 +4075,14 @@ class Cursor(LoggingIdMixin):
                             del blob_value
                 elif datatype == SQLDataType.ARRAY:
                     value = []
-                    val = buffer[offset:offset+length]
-                    arrayid = a.ISC_QUAD((0).from_bytes(val[:4], 'little'),
-                                         (0).from_bytes(val[4:], 'little'))
+                    arrayid = a.ISC_QUAD.from_buffer_copy(buffer, offset)
                     arraydesc = a.ISC_ARRAY_DESC(0)
                     isc_status = a.ISC_STATUS_ARRAY()
                     db_handle = self._connection._get_handle()
                     tr_handle = self._transaction._get_handle()
                     relname = desc.relation.encode(self._encoding)
                     sqlname = desc.field.encode(self._encoding)
-                    api = a.get_api()
+                    api = a.api
                     sqlsubtype = self._connection._get_array_sqlsubtype(relname, sqlname)
                     api.isc_array_lookup_bounds(isc_status, db_handle, tr_handle,
                                                 relname, sqlname, arraydesc)
@@ -3717,7 +4140,8 @@ class Cursor(LoggingIdMixin):
         if not self._transaction.is_active():
             self._transaction.begin()
         if isinstance(operation, Statement):
-            if operation._connection() is not self._connection:
+            # Compared by equality, as internal cursor holds proxy to its connection
+            if operation._connection() != self._connection:
                 raise InterfaceError('Cannot execute Statement that was created by different Connection.')
             self.close()
             self._stmt = operation
@@ -4058,7 +4482,7 @@ class Cursor(LoggingIdMixin):
             for meta in self._stmt._out_desc:
                 scale = meta.scale
                 precision = 0
-                if meta.datatype in (SQLDataType.TEXT, SQLDataType.VARYING):
+                if meta.datatype in _TEXT_TYPES:
                     vtype = str
                     if meta.subtype in (4, 69):  # UTF8 and GB18030
                         dispsize = meta.length // 4
@@ -4066,21 +4490,12 @@ class Cursor(LoggingIdMixin):
                         dispsize = meta.length // 3
                     else:
                         dispsize = meta.length
-                elif (meta.datatype in (SQLDataType.SHORT, SQLDataType.LONG, SQLDataType.INT64)
+                elif (meta.datatype in _FIXED_INT_TYPES
                       and (meta.subtype or meta.scale)):
                     vtype = decimal.Decimal
                     precision = self._connection._determine_field_precision(meta)
                     dispsize = 20
-                elif meta.datatype == SQLDataType.SHORT:
-                    vtype = int
-                    dispsize = 6
-                elif meta.datatype == SQLDataType.LONG:
-                    vtype = int
-                    dispsize = 11
-                elif meta.datatype == SQLDataType.INT64:
-                    vtype = int
-                    dispsize = 20
-                elif meta.datatype in (SQLDataType.FLOAT, SQLDataType.D_FLOAT, SQLDataType.DOUBLE):
+                elif meta.datatype in _FLOAT_TYPES:
                     # Special case, dialect 1 DOUBLE/FLOAT
                     # could be Fixed point
                     if (self._stmt._dialect < 3) and meta.scale:
@@ -4093,24 +4508,8 @@ class Cursor(LoggingIdMixin):
                     vtype = str if meta.subtype == 1 else bytes
                     scale = meta.subtype
                     dispsize = 0
-                elif meta.datatype == SQLDataType.TIMESTAMP:
-                    vtype = datetime.datetime
-                    dispsize = 22
-                elif meta.datatype == SQLDataType.DATE:
-                    vtype = datetime.date
-                    dispsize = 10
-                elif meta.datatype == SQLDataType.TIME:
-                    vtype = datetime.time
-                    dispsize = 11
-                elif meta.datatype == SQLDataType.ARRAY:
-                    vtype = list
-                    dispsize = -1
-                elif meta.datatype == SQLDataType.BOOLEAN:
-                    vtype = bool
-                    dispsize = 5
                 else:
-                    vtype = None
-                    dispsize = -1
+                    vtype, dispsize = _DESC_TYPES.get(meta.datatype, (None, -1))
                 desc.append(tuple([meta.field if meta.field == meta.alias else meta.alias,
                                   vtype, dispsize, meta.length, precision,
                                   scale, meta.nullable]))
@@ -4159,6 +4558,18 @@ class Cursor(LoggingIdMixin):
         """
         return self._name
 
+#: Service info codes with 4-byte integer values
+_SRV_INFO_INT = frozenset((SrvInfoCode.VERSION, SrvInfoCode.CAPABILITIES, SrvInfoCode.RUNNING))
+#: Service info codes with string values
+_SRV_INFO_STR = frozenset((SrvInfoCode.SERVER_VERSION, SrvInfoCode.IMPLEMENTATION,
+                           SrvInfoCode.GET_ENV, SrvInfoCode.GET_ENV_MSG,
+                           SrvInfoCode.GET_ENV_LOCK, SrvInfoCode.USER_DBPATH))
+#: Service info codes with values that don't change for connection, and are thus cached
+_SRV_INFO_CACHED = frozenset((SrvInfoCode.SERVER_VERSION, SrvInfoCode.VERSION,
+                              SrvInfoCode.IMPLEMENTATION, SrvInfoCode.GET_ENV,
+                              SrvInfoCode.USER_DBPATH, SrvInfoCode.GET_ENV_LOCK,
+                              SrvInfoCode.GET_ENV_MSG, SrvInfoCode.CAPABILITIES))
+
 class ServerInfoProvider(InfoProvider):
     """Provides access to information about attached server.
 
@@ -4194,23 +4605,22 @@ class ServerInfoProvider(InfoProvider):
         Returns:
             The data type of returned value depends on information required.
         """
-        if info_code in self._cache:
-            return self._cache[info_code]
+        if (cached := self._cache.get(info_code, NOT_FOUND)) is not NOT_FOUND:
+            return cached
         self.response.clear()
-        request = bytes([info_code])
+        request = _BYTE[info_code]
         self._get_data(request)
         tag = self.response.get_tag()
         if tag != info_code.value:
             raise InterfaceError("An error response was received" if tag == isc_info_error
                                      else "Result code does not match request code")
         #
-        if info_code in (SrvInfoCode.VERSION, SrvInfoCode.CAPABILITIES, SrvInfoCode.RUNNING):
+        if info_code in _SRV_INFO_INT:
             result = self.response.read_int()
-        elif info_code in (SrvInfoCode.SERVER_VERSION, SrvInfoCode.IMPLEMENTATION,
-                           SrvInfoCode.GET_ENV, SrvInfoCode.GET_ENV_MSG,
-                           SrvInfoCode.GET_ENV_LOCK, SrvInfoCode.USER_DBPATH):
+        elif info_code in _SRV_INFO_STR:
             result = self.response.read_sized_string(encoding=self._srv().encoding)
         elif info_code == SrvInfoCode.SRV_DB_INFO:
+            encoding = self._srv().encoding
             num_attachments = -1
             databases = []
             while not self.response.is_eof():
@@ -4220,17 +4630,14 @@ class ServerInfoProvider(InfoProvider):
                 if tag == SrvDbInfoOption.ATT:
                     num_attachments = self.response.read_short()
                 elif tag == SPBItem.DBNAME:
-                    databases.append(self.response.read_sized_string(encoding=self._srv().encoding))
+                    databases.append(self.response.read_sized_string(encoding=encoding))
                 elif tag == SrvDbInfoOption.DB:
                     self.response.read_short()
             result = (num_attachments, databases)
         if self.response.get_tag() != isc_info_end:  # pragma: no cover
             raise InterfaceError("Malformed result buffer (missing isc_info_end item)")
         # cache
-        if info_code in (SrvInfoCode.SERVER_VERSION, SrvInfoCode.VERSION,
-                         SrvInfoCode.IMPLEMENTATION, SrvInfoCode.GET_ENV,
-                         SrvInfoCode.USER_DBPATH, SrvInfoCode.GET_ENV_LOCK,
-                         SrvInfoCode.GET_ENV_MSG, SrvInfoCode.CAPABILITIES):
+        if info_code in _SRV_INFO_CACHED:
             self._cache[info_code] = result
         return result
     def get_log(self, callback: CB_OUTPUT_LINE=None) -> None:
@@ -4239,11 +4646,12 @@ class ServerInfoProvider(InfoProvider):
         Arguments:
             callback: Function to call back with each output line.
         """
-        assert self._srv()._svc is not None
-        self._srv()._reset_output()
-        self._srv()._svc.start(bytes([ServerAction.GET_FB_LOG]))
+        srv = self._srv()
+        assert srv._svc is not None
+        srv._reset_output()
+        srv._svc.start(_BYTE[ServerAction.GET_FB_LOG])
         if callback:
-            for line in self._srv():
+            for line in srv._drain_lines():
                 callback(line)
     @property
     def version(self) -> str:
@@ -4309,9 +4717,81 @@ class ServerServiceProvider:
     def _close(self) -> None:
         self._srv = None
 
+#: Pre-encoded constant SPB clumplets used by service requests
+_SPB_OPT_ACTIVATE = _spb_int(SPBItem.OPTIONS, SrvPropertiesFlag.ACTIVATE)
+_SPB_OPT_NOLINGER = _spb_int(SPBItem.OPTIONS, SrvPropertiesFlag.NOLINGER)
+_SPB_OPT_SWEEP = _spb_int(SPBItem.OPTIONS, SrvRepairFlag.SWEEP_DB)
+_SPB_OPT_UPGRADE = _spb_int(SPBItem.OPTIONS, SrvRepairFlag.UPGRADE_DB)
+
+#: 32-bit transaction ID in limbo transaction report
+_LIMBO_TRA_ID = struct.Struct('<I')
+#: 64-bit transaction ID in limbo transaction report
+_LIMBO_TRA_ID_64 = struct.Struct('<Q')
+#: Limbo transaction report clumplets that start new transaction record, mapped to
+#: `struct.Struct` of transaction ID.
+_LIMBO_ID_ITEMS = {SrvRepairOption.SINGLE_TRA_ID: _LIMBO_TRA_ID,
+                   SrvRepairOption.MULTI_TRA_ID: _LIMBO_TRA_ID,
+                   SrvRepairOption.SINGLE_TRA_ID_64: _LIMBO_TRA_ID_64,
+                   SrvRepairOption.MULTI_TRA_ID_64: _LIMBO_TRA_ID_64}
+#: Reads length of string clumplet in limbo transaction report
+_unpack_limbo_str_len = struct.Struct('<H').unpack_from
+#: Limbo transaction description clumplets mapped to their data size (0 for strings)
+_LIMBO_DESC_ITEMS = {SrvRepairOption.TRA_ID: 4, SrvRepairOption.TRA_ID_64: 8,
+                     SrvRepairOption.TRA_STATE: 1, SrvRepairOption.TRA_ADVISE: 1,
+                     SrvRepairOption.TRA_HOST_SITE: 0, SrvRepairOption.TRA_REMOTE_SITE: 0,
+                     SrvRepairOption.TRA_DB_PATH: 0}
+
+def _parse_limbo_trans_ids(data: bytes) -> List[int]:
+    # Returns transaction IDs from binary limbo transaction report. Report contains one
+    # record per limbo transaction, which starts with its ID (SINGLE_TRA_ID or
+    # MULTI_TRA_ID) followed by description clumplets.
+    size = len(data)
+    pos = 0
+    trans_ids = []
+    while pos < size:
+        tag = data[pos]
+        pos += 1
+        if (tra_id := _LIMBO_ID_ITEMS.get(tag)) is not None:
+            trans_ids.append(tra_id.unpack_from(data, pos)[0])
+            pos += tra_id.size
+        elif (item_size := _LIMBO_DESC_ITEMS.get(tag)) is not None:
+            if item_size == 0: # string clumplet
+                item_size = 2 + _unpack_limbo_str_len(data, pos)[0]
+            pos += item_size
+        else:  # pragma: no cover
+            raise InterfaceError(f"Unrecognized result clumplet: {tag}")
+    return trans_ids
+
 class ServerDbServices3(ServerServiceProvider):
     """Database-related actions and services [Firebird 3+].
     """
+    def _set_property(self, database: FILESPEC, role: Optional[str],
+                      option: SrvPropertiesOption, value: int, as_byte: bool) -> None:
+        # Sets database property via PROPERTIES action. With `Server.cache_properties`
+        # enabled, the request is skipped when the same value was already set through
+        # this service connection.
+        srv = self._srv()
+        if (cache := srv.cache_properties):
+            key = (_fspec(database), option)
+            if srv._props_cache.get(key) == value:
+                return
+        srv._reset_output()
+        with _spb_start_builder() as spb:
+            spb.insert_action(ServerAction.PROPERTIES, database, role, srv.encoding)
+            if as_byte:
+                spb.insert_byte(option, value)
+            else:
+                spb.insert_int(option, value)
+            srv._svc.start(spb.get_buffer())
+        srv.wait()
+        if cache:
+            srv._props_cache[key] = value
+    def _forget_properties(self, database: FILESPEC) -> None:
+        # Drops cached property values for database whose state was changed by other means
+        srv = self._srv()
+        database = _fspec(database)
+        for key in [key for key in srv._props_cache if key[0] == database]:
+            del srv._props_cache[key]
     def get_statistics(self, *, database: FILESPEC,
                        flags: SrvStatFlag=SrvStatFlag.DEFAULT, role: str=None,
                        tables: Sequence[str]=None, callback: CB_OUTPUT_LINE=None) -> None:
@@ -4324,19 +4804,19 @@ class ServerDbServices3(ServerServiceProvider):
             tables: List of database tables whose statistics are to be collected.
             callback: Function to call back with each output line.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
             spb.insert_tag(ServerAction.DB_STATS)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
+            spb.insert_bytes(SPBItem.DBNAME, _encode_spb_str(_fspec(database), srv.encoding))
             spb.insert_int(SPBItem.OPTIONS, flags)
             if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
+                spb.insert_bytes(SPBItem.SQL_ROLE_NAME, _encode_spb_str(role, srv.encoding))
             if tables is not None:
-                for table in tables:
-                    spb.insert_string(64, table, encoding=self._srv().encoding) # isc_spb_sts_table = 64
-            self._srv()._svc.start(spb.get_buffer())
+                spb.insert_strings(64, tables, encoding=srv.encoding) # isc_spb_sts_table = 64
+            srv._svc.start(spb.get_buffer())
         if callback:
-            for line in self._srv():
+            for line in srv._drain_lines():
                 callback(line)
     def backup(self, *, database: FILESPEC, backup: Union[FILESPEC, Sequence[FILESPEC]],
                backup_file_sizes: Sequence[int]=(),
@@ -4370,16 +4850,18 @@ class ServerDbServices3(ServerServiceProvider):
         else:
             assert len(backup) >= 1
             assert len(backup) == len(backup_file_sizes) - 1
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
+        srv = self._srv()
+        enc = srv.encoding
+        srv._reset_output()
+        with _spb_start_builder() as spb:
             spb.insert_tag(ServerAction.BACKUP)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
+            spb.insert_bytes(SPBItem.DBNAME, _encode_spb_str(_fspec(database), enc))
             for filename, size in itertools.zip_longest(backup, backup_file_sizes):
-                spb.insert_string(SrvBackupOption.FILE, str(filename), encoding=self._srv().encoding)
+                spb.insert_string(SrvBackupOption.FILE, _fspec(filename), encoding=enc)
                 if size is not None:
                     spb.insert_int(SrvBackupOption.LENGTH, size)
             if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
+                spb.insert_bytes(SPBItem.SQL_ROLE_NAME, _encode_spb_str(role, enc))
             if skip_data is not None:
                 spb.insert_string(SrvBackupOption.SKIP_DATA, skip_data)
             if include_data is not None:
@@ -4399,9 +4881,9 @@ class ServerDbServices3(ServerServiceProvider):
                 spb.insert_int(SPBItem.VERBINT, verbint)
             if stats:
                 spb.insert_string(SrvBackupOption.STAT, stats)
-            self._srv()._svc.start(spb.get_buffer())
+            srv._svc.start(spb.get_buffer())
         if callback:
-            for line in self._srv():
+            for line in srv._drain_lines():
                 callback(line)
     def restore(self, *, backup: Union[FILESPEC, Sequence[FILESPEC]],
                 database: Union[FILESPEC, Sequence[FILESPEC]],
@@ -4444,26 +4926,29 @@ class ServerDbServices3(ServerServiceProvider):
         else:
             assert len(database) >= 1
             assert len(database) - 1 == len(db_file_pages)
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
+        for filename in database:
+            self._forget_properties(filename)
+        srv = self._srv()
+        enc = srv.encoding
+        srv._reset_output()
+        with _spb_start_builder() as spb:
             spb.insert_tag(ServerAction.RESTORE)
-            for filename in backup:
-                spb.insert_string(SrvRestoreOption.FILE, str(filename), encoding=self._srv().encoding)
+            spb.insert_strings(SrvRestoreOption.FILE, backup, encoding=enc)
             for filename, size in itertools.zip_longest(database, db_file_pages):
-                spb.insert_string(SPBItem.DBNAME, str(filename), encoding=self._srv().encoding)
+                spb.insert_bytes(SPBItem.DBNAME, _encode_spb_str(_fspec(filename), enc))
                 if size is not None:
                     spb.insert_int(SrvRestoreOption.LENGTH, size)
             if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
+                spb.insert_bytes(SPBItem.SQL_ROLE_NAME, _encode_spb_str(role, enc))
             if page_size is not None:
                 spb.insert_int(SrvRestoreOption.PAGE_SIZE, page_size)
             if buffers is not None:
                 spb.insert_int(SrvRestoreOption.BUFFERS, buffers)
-            spb.insert_bytes(SrvRestoreOption.ACCESS_MODE, bytes([access_mode]))
+            spb.insert_byte(SrvRestoreOption.ACCESS_MODE, access_mode)
             if skip_data is not None:
-                spb.insert_string(SrvRestoreOption.SKIP_DATA, skip_data, encoding=self._srv().encoding)
+                spb.insert_string(SrvRestoreOption.SKIP_DATA, skip_data, encoding=enc)
             if include_data is not None:
-                spb.insert_string(SrvRestoreOption.INCLUDE_DATA, include_data, encoding=self._srv().encoding)
+                spb.insert_string(SrvRestoreOption.INCLUDE_DATA, include_data, encoding=enc)
             if keyhoder is not None:
                 spb.insert_string(SrvRestoreOption.KEYHOLDER, keyhoder)
             if keyname is not None:
@@ -4481,9 +4966,9 @@ class ServerDbServices3(ServerServiceProvider):
                 spb.insert_int(SPBItem.VERBINT, verbint)
             if stats:
                 spb.insert_string(SrvRestoreOption.STAT, stats)
-            self._srv()._svc.start(spb.get_buffer())
+            srv._svc.start(spb.get_buffer())
         if callback:
-            for line in self._srv():
+            for line in srv._drain_lines():
                 callback(line)
     def local_backup(self, *, database: FILESPEC, backup_stream: BinaryIO,
                      flags: SrvBackupFlag=SrvBackupFlag.NONE, role: str=None,
@@ -4502,29 +4987,30 @@ class ServerDbServices3(ServerServiceProvider):
             keyname: Key name [Firebird 4]
             crypt: Encryption specification [Firebird 4]
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
             spb.insert_tag(ServerAction.BACKUP)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
+            spb.insert_bytes(SPBItem.DBNAME, _encode_spb_str(_fspec(database), srv.encoding))
             spb.insert_string(SrvBackupOption.FILE, 'stdout')
             spb.insert_int(SPBItem.OPTIONS, flags)
             if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
+                spb.insert_bytes(SPBItem.SQL_ROLE_NAME, _encode_spb_str(role, srv.encoding))
             if skip_data is not None:
                 spb.insert_string(SrvBackupOption.SKIP_DATA, skip_data,
-                                  encoding=self._srv().encoding)
+                                  encoding=srv.encoding)
             if include_data is not None:
                 spb.insert_string(SrvBackupOption.INCLUDE_DATA, include_data,
-                                  encoding=self._srv().encoding)
+                                  encoding=srv.encoding)
             if keyhoder is not None:
                 spb.insert_string(SrvBackupOption.KEYHOLDER, keyhoder)
             if keyname is not None:
                 spb.insert_string(SrvBackupOption.KEYNAME, keyname)
             if crypt is not None:
                 spb.insert_string(SrvBackupOption.CRYPT, crypt)
-            self._srv()._svc.start(spb.get_buffer())
-        while not self._srv()._eof:
-            backup_stream.write(self._srv()._read_next_binary_output())
+            srv._svc.start(spb.get_buffer())
+        while not srv._eof:
+            backup_stream.write(srv._read_next_binary_output())
     def local_restore(self, *, backup_stream: BinaryIO,
                       database: Union[FILESPEC, Sequence[FILESPEC]],
                       db_file_pages: Sequence[int]=(),
@@ -4558,25 +5044,28 @@ class ServerDbServices3(ServerServiceProvider):
         else:
             assert len(database) >= 1
             assert len(database) == len(db_file_pages) - 1
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
+        for filename in database:
+            self._forget_properties(filename)
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
             spb.insert_tag(ServerAction.RESTORE)
             spb.insert_string(SrvRestoreOption.FILE, 'stdin')
             for filename, size in itertools.zip_longest(database, db_file_pages):
-                spb.insert_string(SPBItem.DBNAME, str(filename), encoding=self._srv().encoding)
+                spb.insert_bytes(SPBItem.DBNAME, _encode_spb_str(_fspec(filename), srv.encoding))
                 if size is not None:
                     spb.insert_int(SrvRestoreOption.LENGTH, size)
             if page_size is not None:
                 spb.insert_int(SrvRestoreOption.PAGE_SIZE, page_size)
             if buffers is not None:
                 spb.insert_int(SrvRestoreOption.BUFFERS, buffers)
-            spb.insert_bytes(SrvRestoreOption.ACCESS_MODE, bytes([access_mode]))
+            spb.insert_byte(SrvRestoreOption.ACCESS_MODE, access_mode)
             if skip_data is not None:
                 spb.insert_string(SrvRestoreOption.SKIP_DATA, skip_data,
-                                  encoding=self._srv().encoding)
+                                  encoding=srv.encoding)
             if include_data is not None:
                 spb.insert_string(SrvRestoreOption.INCLUDE_DATA, include_data,
-                                  encoding=self._srv().encoding)
+                                  encoding=srv.encoding)
             if keyhoder is not None:
                 spb.insert_string(SrvRestoreOption.KEYHOLDER, keyhoder)
             if keyname is not None:
@@ -4587,36 +5076,34 @@ class ServerDbServices3(ServerServiceProvider):
                 spb.insert_int(SrvRestoreOption.REPLICA_MODE, replica_mode.value)
             spb.insert_int(SPBItem.OPTIONS, flags)
             if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
-            self._srv()._svc.start(spb.get_buffer())
+                spb.insert_bytes(SPBItem.SQL_ROLE_NAME, _encode_spb_str(role, srv.encoding))
+            srv._svc.start(spb.get_buffer())
         #
         request_length = 0
         line = ''
         keep_going = True
         while keep_going:
             no_data = False
-            self._srv().response.clear()
+            srv.response.rewind()
             if request_length > 0:
                 request_length = min([request_length, 65500])
                 raw = backup_stream.read(request_length)
-                send = b''.join([SrvInfoCode.LINE.to_bytes(1, 'little'),
-                                 len(raw).to_bytes(2, 'little'), raw,
-                                 isc_info_end.to_bytes(1, 'little')])
+                send = b''.join([_SRV_LINE_REQ, len(raw).to_bytes(2, 'little'), raw,
+                                 _INFO_END])
             else:
                 send = None
-            self._srv()._svc.query(send, bytes([SrvInfoCode.STDIN, SrvInfoCode.LINE]),
-                                   self._srv().response.raw)
-            tag = self._srv().response.get_tag()
+            srv._svc.query(send, _SRV_STDIN_LINE_REQ, srv.response.raw)
+            tag = srv.response.get_tag()
             while tag != isc_info_end:
                 if tag == SrvInfoCode.STDIN:
-                    request_length = self._srv().response.read_int()
+                    request_length = srv.response.read_int()
                 elif tag == SrvInfoCode.LINE:
-                    line = self._srv().response.read_sized_string(encoding=self._srv().encoding)
+                    line = srv.response.read_sized_string(encoding=srv.encoding)
                 elif tag == isc_info_data_not_ready:
                     no_data = True
                 else:  # pragma: no cover
                     raise InterfaceError(f"Service responded with error code: {tag}")
-                tag = self._srv().response.get_tag()
+                tag = srv.response.get_tag()
             keep_going = no_data or request_length != 0 or line
     def nbackup(self, *, database: FILESPEC, backup: FILESPEC, level: int=0,
                 direct: bool=None, flags: SrvNBackupFlag=SrvNBackupFlag.NONE,
@@ -4636,11 +5123,12 @@ class ServerDbServices3(ServerServiceProvider):
             Parameters `level` and `guid` are mutually exclusive. If `guid` is specified,
             then `level` value is ignored.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
             spb.insert_tag(ServerAction.NBAK)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            spb.insert_string(SrvNBackupOption.FILE, str(backup), encoding=self._srv().encoding)
+            spb.insert_bytes(SPBItem.DBNAME, _encode_spb_str(_fspec(database), srv.encoding))
+            spb.insert_string(SrvNBackupOption.FILE, _fspec(backup), encoding=srv.encoding)
             if guid is not None:
                 spb.insert_string(SrvNBackupOption.GUID, guid)
             else:
@@ -4648,10 +5136,10 @@ class ServerDbServices3(ServerServiceProvider):
             if direct is not None:
                 spb.insert_string(SrvNBackupOption.DIRECT, 'ON' if direct else 'OFF')
             if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
+                spb.insert_bytes(SPBItem.SQL_ROLE_NAME, _encode_spb_str(role, srv.encoding))
             spb.insert_int(SPBItem.OPTIONS, flags)
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
+            srv._svc.start(spb.get_buffer())
+        srv.wait()
     def nrestore(self, *, backups: Sequence[FILESPEC], database: FILESPEC,
                  direct: bool=False, flags: SrvNBackupFlag=SrvNBackupFlag.NONE,
                  role: str=None) -> None:
@@ -4664,19 +5152,20 @@ class ServerDbServices3(ServerServiceProvider):
             flags: Restore options.
             role: SQL ROLE name passed to nbackup.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
+        self._forget_properties(database)
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
             spb.insert_tag(ServerAction.NREST)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            for backup in backups:
-                spb.insert_string(SrvNBackupOption.FILE, str(backup), encoding=self._srv().encoding)
+            spb.insert_bytes(SPBItem.DBNAME, _encode_spb_str(_fspec(database), srv.encoding))
+            spb.insert_strings(SrvNBackupOption.FILE, backups, encoding=srv.encoding)
             if direct is not None:
                 spb.insert_string(SrvNBackupOption.DIRECT, 'ON' if direct else 'OFF')
             if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
+                spb.insert_bytes(SPBItem.SQL_ROLE_NAME, _encode_spb_str(role, srv.encoding))
             spb.insert_int(SPBItem.OPTIONS, flags)
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
+            srv._svc.start(spb.get_buffer())
+        srv.wait()
     def set_default_cache_size(self, *, database: FILESPEC, size: int, role: str=None) -> None:
         """Set individual page cache size for database.
 
@@ -4684,16 +5173,12 @@ class ServerDbServices3(ServerServiceProvider):
             database: Database specification or alias.
             size: New value.
             role: SQL ROLE name passed to gfix.
+
+        Note:
+            Request is skipped when `.Server.cache_properties` is enabled and the same
+            value was already set via this service connection.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
-            spb.insert_tag(ServerAction.PROPERTIES)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
-            spb.insert_int(SrvPropertiesOption.PAGE_BUFFERS, size)
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
+        self._set_property(database, role, SrvPropertiesOption.PAGE_BUFFERS, size, False)
     def set_sweep_interval(self, *, database: FILESPEC, interval: int, role: str=None) -> None:
         """Set database sweep interval.
 
@@ -4701,16 +5186,12 @@ class ServerDbServices3(ServerServiceProvider):
             database: Database specification or alias.
             interval: New value.
             role: SQL ROLE name passed to gfix.
+
+        Note:
+            Request is skipped when `.Server.cache_properties` is enabled and the same
+            value was already set via this service connection.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
-            spb.insert_tag(ServerAction.PROPERTIES)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
-            spb.insert_int(SrvPropertiesOption.SWEEP_INTERVAL, interval)
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
+        self._set_property(database, role, SrvPropertiesOption.SWEEP_INTERVAL, interval, False)
     def set_space_reservation(self, *, database: FILESPEC, mode: DbSpaceReservation,
                               role: str=None) -> None:
         """Set space reservation for database.
@@ -4719,17 +5200,12 @@ class ServerDbServices3(ServerServiceProvider):
             database: Database specification or alias.
             mode: New value.
             role: SQL ROLE name passed to gfix.
+
+        Note:
+            Request is skipped when `.Server.cache_properties` is enabled and the same
+            value was already set via this service connection.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
-            spb.insert_tag(ServerAction.PROPERTIES)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
-            spb.insert_bytes(SrvPropertiesOption.RESERVE_SPACE,
-                             bytes([mode]))
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
+        self._set_property(database, role, SrvPropertiesOption.RESERVE_SPACE, mode, True)
     def set_write_mode(self, *, database: FILESPEC, mode: DbWriteMode, role: str=None) -> None:
         """Set database write mode (SYNC/ASYNC).
 
@@ -4737,17 +5213,12 @@ class ServerDbServices3(ServerServiceProvider):
             database: Database specification or alias.
             mode: New value.
             role: SQL ROLE name passed to gfix.
+
+        Note:
+            Request is skipped when `.Server.cache_properties` is enabled and the same
+            value was already set via this service connection.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
-            spb.insert_tag(ServerAction.PROPERTIES)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
-            spb.insert_bytes(SrvPropertiesOption.WRITE_MODE,
-                             bytes([mode]))
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
+        self._set_property(database, role, SrvPropertiesOption.WRITE_MODE, mode, True)
     def set_access_mode(self, *, database: FILESPEC, mode: DbAccessMode, role: str=None) -> None:
         """Set database access mode (R/W or R/O).
 
@@ -4755,16 +5226,12 @@ class ServerDbServices3(ServerServiceProvider):
             database: Database specification or alias.
             mode: New value.
             role: SQL ROLE name passed to gfix.
+
+        Note:
+            Request is skipped when `.Server.cache_properties` is enabled and the same
+            value was already set via this service connection.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
-            spb.insert_tag(ServerAction.PROPERTIES)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
-            spb.insert_bytes(SrvPropertiesOption.ACCESS_MODE, bytes([mode]))
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
+        self._set_property(database, role, SrvPropertiesOption.ACCESS_MODE, mode, True)
     def set_sql_dialect(self, *, database: FILESPEC, dialect: int, role: str=None) -> None:
         """Set database SQL dialect.
 
@@ -4772,16 +5239,12 @@ class ServerDbServices3(ServerServiceProvider):
             database: Database specification or alias.
             dialect: New value.
             role: SQL ROLE name passed to gfix.
+
+        Note:
+            Request is skipped when `.Server.cache_properties` is enabled and the same
+            value was already set via this service connection.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
-            spb.insert_tag(ServerAction.PROPERTIES)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
-            spb.insert_int(SrvPropertiesOption.SET_SQL_DIALECT, dialect)
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
+        self._set_property(database, role, SrvPropertiesOption.SET_SQL_DIALECT, dialect, False)
     def activate_shadow(self, *, database: FILESPEC, role: str=None) -> None:
         """Activate database shadow.
 
@@ -4789,15 +5252,13 @@ class ServerDbServices3(ServerServiceProvider):
             database: Database specification or alias.
             role: SQL ROLE name passed to gfix.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
-            spb.insert_tag(ServerAction.PROPERTIES)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
-            spb.insert_int(SPBItem.OPTIONS, SrvPropertiesFlag.ACTIVATE)
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
+            spb.insert_action(ServerAction.PROPERTIES, database, role, srv.encoding)
+            spb.insert_raw(_SPB_OPT_ACTIVATE)
+            srv._svc.start(spb.get_buffer())
+        srv.wait()
     def no_linger(self, *, database: FILESPEC, role: str=None) -> None:
         """Set one-off override for database linger.
 
@@ -4805,15 +5266,13 @@ class ServerDbServices3(ServerServiceProvider):
             database: Database specification or alias.
             role: SQL ROLE name passed to gfix.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
-            spb.insert_tag(ServerAction.PROPERTIES)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
-            spb.insert_int(SPBItem.OPTIONS, SrvPropertiesFlag.NOLINGER)
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
+            spb.insert_action(ServerAction.PROPERTIES, database, role, srv.encoding)
+            spb.insert_raw(_SPB_OPT_NOLINGER)
+            srv._svc.start(spb.get_buffer())
+        srv.wait()
     def shutdown(self, *, database: FILESPEC, mode: ShutdownMode,
                  method: ShutdownMethod, timeout: int, role: str=None) -> None:
         """Database shutdown.
@@ -4825,16 +5284,15 @@ class ServerDbServices3(ServerServiceProvider):
             timeout: Timeout for shutdown.
             role: SQL ROLE name passed to gfix.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
-            spb.insert_tag(ServerAction.PROPERTIES)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
-            spb.insert_bytes(SrvPropertiesOption.SHUTDOWN_MODE, bytes([mode]))
+        self._forget_properties(database)
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
+            spb.insert_action(ServerAction.PROPERTIES, database, role, srv.encoding)
+            spb.insert_byte(SrvPropertiesOption.SHUTDOWN_MODE, mode)
             spb.insert_int(method, timeout)
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
+            srv._svc.start(spb.get_buffer())
+        srv.wait()
     def bring_online(self, *, database: FILESPEC, mode: OnlineMode=OnlineMode.NORMAL,
                      role: str=None) -> None:
         """Bring previously shut down database back online.
@@ -4844,15 +5302,14 @@ class ServerDbServices3(ServerServiceProvider):
             mode: Online mode.
             role: SQL ROLE name passed to gfix.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
-            spb.insert_tag(ServerAction.PROPERTIES)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
-            spb.insert_bytes(SrvPropertiesOption.ONLINE_MODE, bytes([mode]))
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
+        self._forget_properties(database)
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
+            spb.insert_action(ServerAction.PROPERTIES, database, role, srv.encoding)
+            spb.insert_byte(SrvPropertiesOption.ONLINE_MODE, mode)
+            srv._svc.start(spb.get_buffer())
+        srv.wait()
     def sweep(self, *, database: FILESPEC, role: str=None, parallel_workers: int=None) -> None:
         """Perform database sweep operation.
 
@@ -4861,17 +5318,15 @@ class ServerDbServices3(ServerServiceProvider):
             role: SQL ROLE name passed to gfix.
             parallel_workers: Number of parallel workers [Firebird 5]
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
-            spb.insert_tag(ServerAction.REPAIR)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
+            spb.insert_action(ServerAction.REPAIR, database, role, srv.encoding)
             if parallel_workers is not None:
                 spb.insert_int(SrvRepairOption.PARALLEL_WORKERS, parallel_workers)
-            spb.insert_int(SPBItem.OPTIONS, SrvRepairFlag.SWEEP_DB)
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
+            spb.insert_raw(_SPB_OPT_SWEEP)
+            srv._svc.start(spb.get_buffer())
+        srv.wait()
     def repair(self, *, database: FILESPEC, flags: SrvRepairFlag=SrvRepairFlag.REPAIR,
                role: str=None) -> None:
         """Perform database repair operation.  **(SYNC service)**
@@ -4881,19 +5336,18 @@ class ServerDbServices3(ServerServiceProvider):
             flags: Repair flags.
             role: SQL ROLE name passed to gfix.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
-            spb.insert_tag(ServerAction.REPAIR)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
+        self._forget_properties(database)
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
+            spb.insert_action(ServerAction.REPAIR, database, role, srv.encoding)
             spb.insert_int(SPBItem.OPTIONS, flags)
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
+            srv._svc.start(spb.get_buffer())
+        srv.wait()
     def validate(self, *, database: FILESPEC, include_table: str=None,
                  exclude_table: str=None, include_index: str=None,
                  exclude_index: str=None, lock_timeout: int=None, role: str=None,
-                 callback: CB_OUTPUT_LINE=None) -> None:
+                 callback: CB_OUTPUT_LINE=None, client_filter: str=None) -> None:
         """Perform database validation. **(ASYNC service)**
 
         Arguments:
@@ -4907,100 +5361,82 @@ class ServerDbServices3(ServerServiceProvider):
               default is 10 secs. 0 is no-wait, -1 is infinite wait.
             role: SQL ROLE name passed to gfix.
             callback: Function to call back with each output line.
+            client_filter: Regex pattern for output lines passed to `callback`. Lines that
+              do not match (`re.search`) are skipped on client side.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
             spb.insert_tag(ServerAction.VALIDATE)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
+            spb.insert_bytes(SPBItem.DBNAME, _encode_spb_str(_fspec(database), srv.encoding))
             if include_table is not None:
                 spb.insert_string(SrvValidateOption.INCLUDE_TABLE, include_table,
-                                  encoding=self._srv().encoding)
+                                  encoding=srv.encoding)
             if exclude_table is not None:
                 spb.insert_string(SrvValidateOption.EXCLUDE_TABLE, exclude_table,
-                                  encoding=self._srv().encoding)
+                                  encoding=srv.encoding)
             if include_index is not None:
                 spb.insert_string(SrvValidateOption.INCLUDE_INDEX, include_index,
-                                  encoding=self._srv().encoding)
+                                  encoding=srv.encoding)
             if exclude_index is not None:
                 spb.insert_string(SrvValidateOption.EXCLUDE_INDEX, exclude_index,
-                                  encoding=self._srv().encoding)
+                                  encoding=srv.encoding)
             if lock_timeout is not None:
                 spb.insert_int(SrvValidateOption.LOCK_TIMEOUT, lock_timeout)
             if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
-            self._srv()._svc.start(spb.get_buffer())
+                spb.insert_bytes(SPBItem.SQL_ROLE_NAME, _encode_spb_str(role, srv.encoding))
+            srv._svc.start(spb.get_buffer())
         if callback:
-            for line in self._srv():
-                callback(line)
+            if client_filter is None:
+                for line in srv._drain_lines():
+                    callback(line)
+            else:
+                search = re.compile(client_filter).search
+                for line in srv._drain_lines():
+                    if search(line):
+                        callback(line)
     def get_limbo_transaction_ids(self, *, database: FILESPEC) -> List[int]:
         """Returns list of transactions in limbo.
 
         Arguments:
             database: Database specification or alias.
         """
-        raise NotSupportedError("Feature not yet implemented")
-        #with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
-            #spb.insert_tag(ServerAction .REPAIR)
-            #spb.insert_string(SPBItem.DBNAME, str(database))
-            #spb.insert_int(SPBItem.OPTIONS, SrvRepairFlag.LIST_LIMBO_TRANS)
-            #self._srv()._svc.start(spb.get_buffer())
-        #self._srv()._reset_output()
-        #self._srv()._fetch_complex_info(bytes([SrvInfoCode.LIMBO_TRANS]))
-        #trans_ids = []
-        #while not self._srv().response.is_eof():
-            #tag = self._srv().response.get_tag()
-            #if tag == SrvInfoCode.TIMEOUT:
-                #return None
-            #if tag == SrvInfoCode.LIMBO_TRANS:
-                #size = self._srv().response.read_short()
-                #while not self._srv().response.is_eof() and self._srv().response.pos < size:
-                    #tag = self._srv().response.get_tag()
-                    #if tag == SrvRepairOption.TRA_HOST_SITE:
-                        #site = self._srv().response.get_string()
-                    #elif tag == SrvRepairOption.TRA_STATE:
-                        #tag = self._srv().response.get_tag()
-                        #if tag == SrvRepairOption.TRA_STATE_LIMBO:
-                            #state = TransactionState.LIMBO
-                        #elif tag == SrvRepairOption.TRA_STATE_COMMIT:
-                            #state = TransactionState.COMMIT
-                        #elif tag == SrvRepairOption.TRA_STATE_ROLLBACK:
-                            #state = TransactionState.ROLLBACK
-                        #elif tag == SrvRepairOption.TRA_STATE_UNKNOWN:
-                            #state = TransactionState.UNKNOWN
-                        #else:
-                            #raise InterfaceError(f"Unknown transaction state {tag}")
-                    #elif tag == SrvRepairOption.TRA_REMOTE_SITE:
-                        #remote_site = self._srv().response.get_string()
-                    #elif tag == SrvRepairOption.TRA_DB_PATH:
-                        #db_path = self._srv().response.get_string()
-                    #elif tag == SrvRepairOption.TRA_ADVISE:
-                        #tag = self._srv().response.get_tag()
-                        #if tag == SrvRepairOption.TRA_ADVISE_COMMIT:
-                            #advise = TransactionState.COMMIT
-                        #elif tag == SrvRepairOption.TRA_ADVISE_ROLLBACK:
-                            #advise = TransactionState.ROLLBACK
-                        #elif tag == SrvRepairOption.TRA_ADVISE_UNKNOWN:
-                            #advise = TransactionState.UNKNOWN
-                        #else:
-                            #raise InterfaceError(f"Unknown transaction state {tag}")
-                    #elif tag == SrvRepairOption.MULTI_TRA_ID:
-                        #multi_id = self._srv().response.get_int()
-                    #elif tag == SrvRepairOption.SINGLE_TRA_ID:
-                        #single_id = self._srv().response.get_int()
-                    #elif tag == SrvRepairOption.TRA_ID:
-                        #tra_id = self._srv().response.get_int()
-                    #elif tag == SrvRepairOption.MULTI_TRA_ID_64:
-                        #multi_id = self._srv().response.get_int64()
-                    #elif tag == SrvRepairOption.SINGLE_TRA_ID_64:
-                        #single_id = self._srv().response.get_int64()
-                    #elif tag == SrvRepairOption.TRA_ID_64:
-                        #tra_id = self._srv().response.get_int64()
-                    #else:
-                        #raise InterfaceError(f"Unknown transaction state {tag}")
-                    #trans_ids.append(None)
-        #if self._srv().response.get_tag() != isc_info_end:
-            #raise InterfaceError("Malformed result buffer (missing isc_info_end item)")
-        #return trans_ids
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
+            spb.insert_tag(ServerAction.REPAIR)
+            spb.insert_bytes(SPBItem.DBNAME, _encode_spb_str(_fspec(database), srv.encoding))
+            spb.insert_int(SPBItem.OPTIONS, SrvRepairFlag.LIST_LIMBO_TRANS)
+            srv._svc.start(spb.get_buffer())
+        # Collect whole binary report first, as clumplets could be split between responses
+        response = srv.response
+        request = _BYTE[SrvInfoCode.LIMBO_TRANS]
+        chunks = []
+        while True:
+            response.rewind()
+            srv._svc.query(None, request, response.raw)
+            if (tag := response.get_tag()) == isc_info_end:
+                break
+            if tag != SrvInfoCode.LIMBO_TRANS:  # pragma: no cover
+                raise InterfaceError(f"Service responded with error code: {tag}")
+            if not (chunk := response.read_bytes()):
+                break
+            chunks.append(chunk)
+        return _parse_limbo_trans_ids(b''.join(chunks))
+    def __resolve_limbo_transactions(self, database: FILESPEC, transaction_ids: Sequence[int],
+                                     tag: SrvRepairOption, tag_64: SrvRepairOption) -> None:
+        srv = self._srv()
+        dbname = _encode_spb_str(_fspec(database), srv.encoding)
+        for transaction_id in transaction_ids:
+            with _spb_start_builder() as spb:
+                spb.insert_tag(ServerAction.REPAIR)
+                spb.insert_bytes(SPBItem.DBNAME, dbname)
+                if transaction_id <= USHRT_MAX:
+                    spb.insert_int(tag, transaction_id)
+                else:
+                    spb.insert_bigint(tag_64, transaction_id)
+                srv._svc.start(spb.get_buffer())
+            srv._read_all_binary_output()
     def commit_limbo_transaction(self, *, database: FILESPEC, transaction_id: int) -> None:
         """Resolve limbo transaction with commit.
 
@@ -5008,15 +5444,25 @@ class ServerDbServices3(ServerServiceProvider):
             database: Database specification or alias.
             transaction_id: ID of Transaction to resolve.
         """
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
-            spb.insert_tag(ServerAction.REPAIR)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            if transaction_id <= USHRT_MAX:
-                spb.insert_int(SrvRepairOption.COMMIT_TRANS, transaction_id)
-            else:
-                spb.insert_bigint(SrvRepairOption.COMMIT_TRANS_64, transaction_id)
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv()._read_all_binary_output()
+        self.__resolve_limbo_transactions(database, (transaction_id, ),
+                                          SrvRepairOption.COMMIT_TRANS,
+                                          SrvRepairOption.COMMIT_TRANS_64)
+    def commit_limbo_transactions(self, *, database: FILESPEC,
+                                  transaction_ids: Sequence[int]) -> None:
+        """Resolve limbo transactions with commit.
+
+        Arguments:
+            database: Database specification or alias.
+            transaction_ids: IDs of Transactions to resolve.
+
+        Note:
+            Service manager resolves only one transaction per request, so transactions
+            are resolved one by one, but SPB parts common to all requests are prepared
+            only once.
+        """
+        self.__resolve_limbo_transactions(database, transaction_ids,
+                                          SrvRepairOption.COMMIT_TRANS,
+                                          SrvRepairOption.COMMIT_TRANS_64)
     def rollback_limbo_transaction(self, *, database: FILESPEC, transaction_id: int) -> None:
         """Resolve limbo transaction with rollback.
 
@@ -5024,15 +5470,25 @@ class ServerDbServices3(ServerServiceProvider):
             database: Database specification or alias.
             transaction_id: ID of Transaction to resolve.
         """
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
-            spb.insert_tag(ServerAction.REPAIR)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            if transaction_id <= USHRT_MAX:
-                spb.insert_int(SrvRepairOption.ROLLBACK_TRANS, transaction_id)
-            else:
-                spb.insert_bigint(SrvRepairOption.ROLLBACK_TRANS_64, transaction_id)
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv()._read_all_binary_output()
+        self.__resolve_limbo_transactions(database, (transaction_id, ),
+                                          SrvRepairOption.ROLLBACK_TRANS,
+                                          SrvRepairOption.ROLLBACK_TRANS_64)
+    def rollback_limbo_transactions(self, *, database: FILESPEC,
+                                    transaction_ids: Sequence[int]) -> None:
+        """Resolve limbo transactions with rollback.
+
+        Arguments:
+            database: Database specification or alias.
+            transaction_ids: IDs of Transactions to resolve.
+
+        Note:
+            Service manager resolves only one transaction per request, so transactions
+            are resolved one by one, but SPB parts common to all requests are prepared
+            only once.
+        """
+        self.__resolve_limbo_transactions(database, transaction_ids,
+                                          SrvRepairOption.ROLLBACK_TRANS,
+                                          SrvRepairOption.ROLLBACK_TRANS_64)
 
 class ServerDbServices4(ServerDbServices3):
     """Database-related actions and services [Firebird 4+].
@@ -5046,15 +5502,14 @@ class ServerDbServices4(ServerDbServices3):
             role: SQL ROLE name passed to nbackup.
             flags: Backup options.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
-            spb.insert_tag(ServerAction.NFIX)
+        self._forget_properties(database)
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
+            spb.insert_action(ServerAction.NFIX, database, role, srv.encoding)
             spb.insert_int(SPBItem.OPTIONS, flags)
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
+            srv._svc.start(spb.get_buffer())
+        srv.wait()
     def set_replica_mode(self, *, database: FILESPEC, mode: ReplicaMode, role: str=None) -> None:
         """Manage replica database.
 
@@ -5062,16 +5517,12 @@ class ServerDbServices4(ServerDbServices3):
             database: Database specification or alias.
             mode: New replication mode.
             role: SQL ROLE name passed to gfix.
+
+        Note:
+            Request is skipped when `.Server.cache_properties` is enabled and the same
+            value was already set via this service connection.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
-            spb.insert_tag(ServerAction.PROPERTIES)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            if role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, role, encoding=self._srv().encoding)
-            spb.insert_bytes(SrvPropertiesOption.REPLICA_MODE, bytes([mode]))
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
+        self._set_property(database, role, SrvPropertiesOption.REPLICA_MODE, mode, True)
 
 class ServerDbServices(ServerDbServices4):
     """Database-related actions and services [Firebird 5+].
@@ -5084,48 +5535,57 @@ class ServerDbServices(ServerDbServices4):
             flags: Repair flags.
             role: SQL ROLE name passed to gfix.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
             spb.insert_tag(ServerAction.REPAIR)
-            spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            spb.insert_int(SPBItem.OPTIONS, SrvRepairFlag.UPGRADE_DB)
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
-
+            spb.insert_bytes(SPBItem.DBNAME, _encode_spb_str(_fspec(database), srv.encoding))
+            spb.insert_raw(_SPB_OPT_UPGRADE)
+            srv._svc.start(spb.get_buffer())
+        srv.wait()
+
+
+def _read_user_str(data: Buffer, encoding: str) -> str:
+    return data.read_sized_string(encoding=encoding)
+
+def _read_user_int(data: Buffer, encoding: str) -> int: # pylint: disable=W0613
+    return data.read_int()
+
+#: Result clumplets returned by DISPLAY_USER(_ADM) service, mapped to position of
+#: `.UserInfo` field and reader function.
+_USER_INFO_ITEMS = {
+    SrvUserOption.USER_NAME: (0, _read_user_str),
+    SrvUserOption.PASSWORD: (1, lambda data, encoding: data.read_bytes()),
+    SrvUserOption.FIRST_NAME: (2, _read_user_str),
+    SrvUserOption.MIDDLE_NAME: (3, _read_user_str),
+    SrvUserOption.LAST_NAME: (4, _read_user_str),
+    SrvUserOption.USER_ID: (5, _read_user_int),
+    SrvUserOption.GROUP_ID: (6, _read_user_int),
+    SrvUserOption.GROUP_NAME: (7, _read_user_str),
+    SrvUserOption.ADMIN: (8, lambda data, encoding: bool(data.read_int())),
+    }
+_EMPTY_USER_INFO = (None, ) * len(_USER_INFO_ITEMS)
 
 class ServerUserServices(ServerServiceProvider):
     """User-related actions and services.
     """
     def __fetch_users(self, data: Buffer) -> List[UserInfo]:
+        encoding = self._srv().encoding
         users = []
-        user = {}
+        user = None
         while not data.is_eof():
             tag = data.get_tag()
-            if tag == SrvUserOption.USER_NAME:
-                if user:
-                    users.append(UserInfo(**user))
-                    user.clear()
-                user['user_name'] = data.read_sized_string(encoding=self._srv().encoding)
-            elif tag == SrvUserOption.USER_ID:
-                user['user_id'] = data.read_int()
-            elif tag == SrvUserOption.GROUP_ID:
-                user['group_id'] = data.read_int()
-            elif tag == SrvUserOption.PASSWORD:  # pragma: no cover
-                user['password'] = data.read_bytes()
-            elif tag == SrvUserOption.GROUP_NAME:  # pragma: no cover
-                user['group_name'] = data.read_sized_string(encoding=self._srv().encoding)
-            elif tag == SrvUserOption.FIRST_NAME:
-                user['first_name'] = data.read_sized_string(encoding=self._srv().encoding)
-            elif tag == SrvUserOption.MIDDLE_NAME:
-                user['middle_name'] = data.read_sized_string(encoding=self._srv().encoding)
-            elif tag == SrvUserOption.LAST_NAME:
-                user['last_name'] = data.read_sized_string(encoding=self._srv().encoding)
-            elif tag == SrvUserOption.ADMIN:
-                user['admin'] = bool(data.read_int())
-            else:  # pragma: no cover
+            item = _USER_INFO_ITEMS.get(tag)
+            if item is None:  # pragma: no cover
                 raise InterfaceError(f"Unrecognized result clumplet: {tag}")
-        if user:
-            users.append(UserInfo(**user))
+            if tag == SrvUserOption.USER_NAME or user is None:
+                if user is not None:
+                    users.append(UserInfo(*user))
+                user = list(_EMPTY_USER_INFO)
+            index, reader = item
+            user[index] = reader(data, encoding)
+        if user is not None:
+            users.append(UserInfo(*user))
         return users
     def get_all(self, *, database: FILESPEC=None, sql_role: str=None) -> List[UserInfo]:
         """Get information about users.
@@ -5134,16 +5594,16 @@ class ServerUserServices(ServerServiceProvider):
             database: Database specification or alias.
             sql_role: SQL role name.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
             spb.insert_tag(ServerAction.DISPLAY_USER_ADM)
             if database is not None:
-                spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
+                spb.insert_bytes(SPBItem.DBNAME, _encode_spb_str(_fspec(database), srv.encoding))
             if sql_role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, sql_role,
-                                  encoding=self._srv().encoding)
-            self._srv()._svc.start(spb.get_buffer())
-        return self.__fetch_users(Buffer(self._srv()._read_all_binary_output()))
+                spb.insert_bytes(SPBItem.SQL_ROLE_NAME, _encode_spb_str(sql_role, srv.encoding))
+            srv._svc.start(spb.get_buffer())
+        return self.__fetch_users(Buffer(srv._read_all_binary_output()))
     def get(self, user_name: str, *, database: FILESPEC=None, sql_role: str=None) -> Optional[UserInfo]:
         """Get information about user.
 
@@ -5152,16 +5612,17 @@ class ServerUserServices(ServerServiceProvider):
             database: Database specification or alias.
             sql_role: SQL role name.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
             spb.insert_tag(ServerAction.DISPLAY_USER_ADM)
             if database is not None:
-                spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            spb.insert_string(SrvUserOption.USER_NAME, user_name, encoding=self._srv().encoding)
+                spb.insert_bytes(SPBItem.DBNAME, _encode_spb_str(_fspec(database), srv.encoding))
+            spb.insert_string(SrvUserOption.USER_NAME, user_name, encoding=srv.encoding)
             if sql_role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, sql_role, encoding=self._srv().encoding)
-            self._srv()._svc.start(spb.get_buffer())
-        users = self.__fetch_users(Buffer(self._srv()._read_all_binary_output()))
+                spb.insert_bytes(SPBItem.SQL_ROLE_NAME, _encode_spb_str(sql_role, srv.encoding))
+            srv._svc.start(spb.get_buffer())
+        users = self.__fetch_users(Buffer(srv._read_all_binary_output()))
         return users[0] if users else None
     def add(self, *, user_name: str, password: str, user_id: int=None,
                  group_id: int=None, first_name: str=None, middle_name: str=None,
@@ -5181,33 +5642,34 @@ class ServerUserServices(ServerServiceProvider):
             database: Database specification or alias.
             sql_role: SQL role name.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
             spb.insert_tag(ServerAction.ADD_USER)
             if database is not None:
-                spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
-            spb.insert_string(SrvUserOption.USER_NAME, user_name, encoding=self._srv().encoding)
+                spb.insert_bytes(SPBItem.DBNAME, _encode_spb_str(_fspec(database), srv.encoding))
+            spb.insert_string(SrvUserOption.USER_NAME, user_name, encoding=srv.encoding)
             if sql_role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, sql_role, encoding=self._srv().encoding)
+                spb.insert_bytes(SPBItem.SQL_ROLE_NAME, _encode_spb_str(sql_role, srv.encoding))
             spb.insert_string(SrvUserOption.PASSWORD, password,
-                              encoding=self._srv().encoding)
+                              encoding=srv.encoding)
             if user_id is not None:
                 spb.insert_int(SrvUserOption.USER_ID, user_id)
             if group_id is not None:
                 spb.insert_int(SrvUserOption.GROUP_ID, group_id)
             if first_name is not None:
                 spb.insert_string(SrvUserOption.FIRST_NAME, first_name,
-                                  encoding=self._srv().encoding)
+                                  encoding=srv.encoding)
             if middle_name is not None:
                 spb.insert_string(SrvUserOption.MIDDLE_NAME, middle_name,
-                                  encoding=self._srv().encoding)
+                                  encoding=srv.encoding)
             if last_name is not None:
                 spb.insert_string(SrvUserOption.LAST_NAME, last_name,
-                                  encoding=self._srv().encoding)
+                                  encoding=srv.encoding)
             if admin is not None:
                 spb.insert_int(SrvUserOption.ADMIN, 1 if admin else 0)
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
+            srv._svc.start(spb.get_buffer())
+        srv.wait()
     def update(self, user_name: str, *, password: str=None,
                     user_id: int=None, group_id: int=None,
                     first_name: str=None, middle_name: str=None,
@@ -5224,33 +5686,34 @@ class ServerUserServices(ServerServiceProvider):
             last_name: User's last name.
             admin: Admin flag.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
             spb.insert_tag(ServerAction.MODIFY_USER)
             spb.insert_string(SrvUserOption.USER_NAME, user_name,
-                              encoding=self._srv().encoding)
+                              encoding=srv.encoding)
             if database is not None:
-                spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
+                spb.insert_bytes(SPBItem.DBNAME, _encode_spb_str(_fspec(database), srv.encoding))
             if password is not None:
                 spb.insert_string(SrvUserOption.PASSWORD, password,
-                                  encoding=self._srv().encoding)
+                                  encoding=srv.encoding)
             if user_id is not None:
                 spb.insert_int(SrvUserOption.USER_ID, user_id)
             if group_id is not None:
                 spb.insert_int(SrvUserOption.GROUP_ID, group_id)
             if first_name is not None:
                 spb.insert_string(SrvUserOption.FIRST_NAME, first_name,
-                                  encoding=self._srv().encoding)
+                                  encoding=srv.encoding)
             if middle_name is not None:
                 spb.insert_string(SrvUserOption.MIDDLE_NAME, middle_name,
-                                  encoding=self._srv().encoding)
+                                  encoding=srv.encoding)
             if last_name is not None:
                 spb.insert_string(SrvUserOption.LAST_NAME, last_name,
-                                  encoding=self._srv().encoding)
+                                  encoding=srv.encoding)
             if admin is not None:
                 spb.insert_int(SrvUserOption.ADMIN, 1 if admin else 0)
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
+            srv._svc.start(spb.get_buffer())
+        srv.wait()
     def delete(self, user_name: str, *, database: FILESPEC=None, sql_role: str=None) -> None:
         """Delete user.
 
@@ -5259,16 +5722,17 @@ class ServerUserServices(ServerServiceProvider):
             database: Database specification or alias.
             sql_role: SQL role name.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
             spb.insert_tag(ServerAction.DELETE_USER)
-            spb.insert_string(SrvUserOption.USER_NAME, user_name, encoding=self._srv().encoding)
+            spb.insert_string(SrvUserOption.USER_NAME, user_name, encoding=srv.encoding)
             if database is not None:
-                spb.insert_string(SPBItem.DBNAME, str(database), encoding=self._srv().encoding)
+                spb.insert_bytes(SPBItem.DBNAME, _encode_spb_str(_fspec(database), srv.encoding))
             if sql_role is not None:
-                spb.insert_string(SPBItem.SQL_ROLE_NAME, sql_role, encoding=self._srv().encoding)
-            self._srv()._svc.start(spb.get_buffer())
-        self._srv().wait()
+                spb.insert_bytes(SPBItem.SQL_ROLE_NAME, _encode_spb_str(sql_role, srv.encoding))
+            srv._svc.start(spb.get_buffer())
+        srv.wait()
     def exists(self, user_name: str, *, database: FILESPEC=None, sql_role: str=None) -> bool:
         """Returns True if user exists.
 
@@ -5279,17 +5743,37 @@ class ServerUserServices(ServerServiceProvider):
         """
         return self.get(user_name, database=database, sql_role=sql_role) is not None
 
+def _trace_timestamp(value: str) -> datetime.datetime:
+    # Trace session list reports timestamps in fixed 'YYYY-MM-DD HH:MM:SS' format
+    return datetime.datetime(int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                             int(value[11:13]), int(value[14:16]), int(value[17:19]))
+
+#: Pattern matching single session entry in TRACE_LIST service output
+_TRACE_SESSION_RE = re.compile(r'^[ \t]*Session ID:[ \t\r]*(\d+)[ \t\r]*\n'
+                               r'(?:[ \t\r]*name:[ \t\r]*(.*?)[ \t\r]*\n)?'
+                               r'[ \t\r]*user:[ \t\r]*(.*?)[ \t\r]*\n'
+                               r'[ \t\r]*date:[ \t\r]*(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)[ \t\r]*\n'
+                               r'(?:[ \t\r]*flags:[ \t\r]*(.*?)[ \t\r]*$)?', re.M)
+#: Pattern matching session entry header, used to detect entries not matched by `_TRACE_SESSION_RE`
+_TRACE_SESSION_HDR_RE = re.compile(r'^[ \t]*Session ID:', re.M)
+
+#: Prefix of trace service responses that report success
+_TRACE_SESSION_MSG = 'Trace session ID '
+
 class ServerTraceServices(ServerServiceProvider):
     """Trace session actions and services.
     """
     def __action(self, action: ServerAction, label: str, session_id: int) -> str:
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
             spb.insert_tag(action)
             spb.insert_int(SrvTraceOption.ID, session_id)
-            self._srv()._svc.start(spb.get_buffer())
-        response = self._srv()._fetch_line()
-        if not response.startswith(f"Trace session ID {session_id} {label}"):  # pragma: no cover
+            srv._svc.start(spb.get_buffer())
+        response = srv._fetch_line()
+        # Expected response is 'Trace session ID <session_id> <label>'
+        if not (response.startswith(_TRACE_SESSION_MSG)
+                and response.split(None, 5)[3:5] == [str(session_id), label]):  # pragma: no cover
             # response should contain the error message
             raise DatabaseError(response)
         return response
@@ -5303,16 +5787,17 @@ class ServerTraceServices(ServerServiceProvider):
         Returns:
             Trace session ID.
         """
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
+        srv = self._srv()
+        srv._reset_output()
+        with _spb_start_builder() as spb:
             spb.insert_tag(ServerAction.TRACE_START)
             if name is not None:
                 spb.insert_string(SrvTraceOption.NAME, name)
-            spb.insert_string(SrvTraceOption.CONFIG, config, encoding=self._srv().encoding)
-            self._srv()._svc.start(spb.get_buffer())
-        response = self._srv()._fetch_line()
-        if response.startswith('Trace session ID'):
-            return int(response.split()[3])
+            spb.insert_string(SrvTraceOption.CONFIG, config, encoding=srv.encoding)
+            srv._svc.start(spb.get_buffer())
+        response = srv._fetch_line()
+        if response.startswith(_TRACE_SESSION_MSG):
+            return int(response.split(None, 4)[3])
         # pragma: no cover
         # response should contain the error message
         raise DatabaseError(response)
@@ -5350,37 +5835,19 @@ class ServerTraceServices(ServerServiceProvider):
     def sessions(self) -> Dict[int, TraceSession]:
         """Dictionary with active trace sessions.
         """
-        def store():
-            if current:
-                session = TraceSession(**current)
-                result[session.id] = session
-                current.clear()
-
-        self._srv()._reset_output()
-        with a.get_api().util.get_xpb_builder(XpbKind.SPB_START) as spb:
-            spb.insert_tag(ServerAction.TRACE_LIST)
-            self._srv()._svc.start(spb.get_buffer())
+        srv = self._srv()
+        srv._reset_output()
+        srv._svc.start(_BYTE[ServerAction.TRACE_LIST])
         result = {}
-        current = {}
-        for line in self._srv():
-            if not line.strip():
-                store()
-            elif line.startswith('Session ID:'):
-                store()
-                current['id'] = int(line.split(':')[1].strip())
-            elif line.lstrip().startswith('name:'):
-                current['name'] = line.split(':')[1].strip()
-            elif line.lstrip().startswith('user:'):
-                current['user'] = line.split(':')[1].strip()
-            elif line.lstrip().startswith('date:'):
-                current['timestamp'] = datetime.datetime.strptime(
-                    line.split(':', 1)[1].strip(),
-                    '%Y-%m-%d %H:%M:%S')
-            elif line.lstrip().startswith('flags:'):
-                current['flags'] = line.split(':')[1].strip().split(',')
-            else:  # pragma: no cover
-                raise InterfaceError(f"Unexpected line in trace session list: {line}")
-        store()
+        text = ''.join(srv._drain_lines())
+        matches = list(_TRACE_SESSION_RE.finditer(text))
+        if len(matches) != len(_TRACE_SESSION_HDR_RE.findall(text)):  # pragma: no cover
+            raise InterfaceError("Unexpected line in trace session list")
+        for m in matches:
+            session_id, name, user, date, flags = m.groups()
+            session_id = int(session_id)
+            result[session_id] = TraceSession(session_id, user, _trace_timestamp(date),
+                                              name or '', flags.split(',') if flags else [])
         return result
 
 class Server(LoggingIdMixin):
@@ -5401,17 +5868,22 @@ class Server(LoggingIdMixin):
         #: Response buffer used to comunicate with service
         self.response: CBuffer = CBuffer(USHRT_MAX)
         self._eof: bool = False
-        self.__line_buffer: List[str] = []
+        self.__line_buffer: deque = deque()
+        #: When True, database property setters (like `.ServerDbServices.set_write_mode()`)
+        #: skip requests that would set value already set via this service connection.
+        #: Disabled by default, as changes made by other means (SQL, gfix, other
+        #: connections) or via different database specification (alias vs. path) are
+        #: not detected.
+        self.cache_properties: bool = False
+        # Database property values set via this service connection, used when
+        # `cache_properties` is enabled. Key is (database, SrvPropertiesOption).
+        self._props_cache: Dict[Tuple[str, SrvPropertiesOption], int] = {}
         #: Encoding used for text data exchange with server
         self.encoding: str = encoding
         #: Handler used for encoding errors. See: `codecs#error-handlers`
         self.encoding_errors: str = encoding_errors
         #
         self.__ev: float = None
-        self.__info: ServerInfoProvider = None
-        self.__dbsvc: Union[ServerDbServices, ServerDbServices3] = None
-        self.__trace: ServerTraceServices = None
-        self.__user: ServerUserServices = None
     def __enter__(self) -> Server:
         return self
     def __exit__(self, exc_type, exc_value, traceback) -> None:
@@ -5430,76 +5902,104 @@ class Server(LoggingIdMixin):
         return f'Server[v{self.info.version}@{self.host.replace(":service_mgr","")}]'
     def _engine_version(self) -> float:
         if self.__ev is None:
-            self.__ev = _engine_version_provider.get_engine_version(weakref.ref(self))
+            # Info provider fetches the engine version when created, and it's needed anyway
+            self.__ev = self.info.engine_version
         return self.__ev
     def _reset_output(self) -> None:
         self._eof = False
         self.__line_buffer.clear()
-    def _make_request(self, timeout: int) -> bytes:
-        if timeout == -1:
-            return None
-        return b''.join([SrvInfoCode.TIMEOUT.value.to_bytes(1, 'little'),
-                         (2).to_bytes(2, 'little'),
-                         timeout.to_bytes(2, 'little')])
     def _fetch_complex_info(self, request: bytes, timeout: int=-1) -> None:
-        send = self._make_request(timeout)
-        self.response.clear()
+        send = _make_request_bytes(timeout)
+        self.response.rewind()
         self._svc.query(send, request, self.response.raw)
         if self.response.is_truncated():  # pragma: no cover
             raise InterfaceError("Requested data can't fint into largest possible buffer")
     def _fetch_line(self, timeout: int=-1) -> Optional[str]: # pylint: disable=W0613
-        self._fetch_complex_info(bytes([SrvInfoCode.LINE]))
+        # Output is always fetched without timeout, so the query is issued directly
+        resp = self.response
+        resp.rewind()
+        self._svc.query(None, _SRV_LINE_REQ, resp.raw)
+        if resp.is_truncated():  # pragma: no cover
+            raise InterfaceError("Requested data can't fint into largest possible buffer")
+        get_tag = resp.get_tag
+        is_eof = resp.is_eof
+        encoding = self.encoding
         result = None
-        while not self.response.is_eof():
-            tag = self.response.get_tag()
-            if tag == SrvInfoCode.TIMEOUT:
+        while not is_eof():
+            tag = get_tag()
+            if tag == _SRV_LINE:
+                result = resp.read_sized_string(encoding=encoding)
+            elif tag == _SRV_TIMEOUT:
                 return None
-            if tag == SrvInfoCode.LINE:
-                result = self.response.read_sized_string(encoding=self.encoding)
-        if self.response.get_tag() != isc_info_end:  # pragma: no cover
+        if get_tag() != isc_info_end:  # pragma: no cover
             raise InterfaceError("Malformed result buffer (missing isc_info_end item)")
         return result
     def _query_output(self, timeout: int) -> str:
         assert self._svc is not None
-        self.response.clear()
-        self._svc.query(self._make_request(timeout), bytes([self.mode]), self.response.raw)
+        self.response.rewind()
+        self._svc.query(_make_request_bytes(timeout), _BYTE[self.mode], self.response.raw)
         if (tag := self.response.get_tag()) != self.mode:  # pragma: no cover
             raise InterfaceError(f"Service responded with error code: {tag}")
         return self.response.read_sized_string(encoding=self.encoding, errors=self.encoding_errors)
     def _read_output(self, *, init: str='', timeout: int=-1) -> None:
         data = self._query_output(timeout)
+        self.__line_buffer.clear()
         if self.mode is SrvInfoCode.TO_EOF:
             self._eof = self.response.get_tag() == isc_info_end
+            init += data
+            if '\n' in init or '\r' in init:
+                self.__line_buffer.extend(init.splitlines(keepends=True))
+            elif init:
+                # Single (possibly incomplete) line, no need to split
+                self.__line_buffer.append(init)
         else: # LINE mode
             self._eof = not data
             while (tag := self.response.get_tag()) == isc_info_truncated:
                 data += self._query_output(timeout)
             if tag != isc_info_end:  # pragma: no cover
                 raise InterfaceError("Malformed result buffer (missing isc_info_end item)")
-        init += data
-        if data and self.mode is SrvInfoCode.LINE:
-            init += '\n'
-        self.__line_buffer = init.splitlines(keepends=True)
+            # Server sends whole lines in this mode, so they are buffered as they are
+            if data:
+                init += data + '\n'
+            if init:
+                self.__line_buffer.append(init)
+    def _drain_lines(self) -> Iterator[str]:
+        # Yields remaining output lines from last service query. All lines parsed from
+        # single service response are handed out at once, with only incomplete last line
+        # carried over to next query.
+        pending = ''
+        while True:
+            if (lines := self.__line_buffer):
+                if not self._eof and not lines[-1].endswith('\n'):
+                    pending = lines.pop()
+                while lines:
+                    yield lines.popleft()
+            if self._eof:
+                if pending:
+                    yield pending
+                return
+            self._read_output(init=pending)
+            pending = ''
     def _read_all_binary_output(self, *, timeout: int=-1) -> bytes:
         assert self._svc is not None
-        send = self._make_request(timeout)
-        result = []
+        send = _make_request_bytes(timeout)
+        result = bytearray()
         eof = False
         while not eof:
-            self.response.clear()
-            self._svc.query(send, bytes([SrvInfoCode.TO_EOF]), self.response.raw)
+            self.response.rewind()
+            self._svc.query(send, _BYTE[SrvInfoCode.TO_EOF], self.response.raw)
             if (tag := self.response.get_tag()) != SrvInfoCode.TO_EOF:  # pragma: no cover
                 raise InterfaceError(f"Service responded with error code: {tag}")
-            result.append(self.response.read_bytes())
+            result += self.response.read_bytes()
             eof = self.response.get_tag() == isc_info_end
-        return b''.join(result)
+        return bytes(result)
     def _read_next_binary_output(self, *, timeout: int=-1) -> bytes:
         assert self._svc is not None
         result = None
         if not self._eof:
-            send = self._make_request(timeout)
-            self.response.clear()
-            self._svc.query(send, bytes([SrvInfoCode.TO_EOF]), self.response.raw)
+            send = _make_request_bytes(timeout)
+            self.response.rewind()
+            self._svc.query(send, _BYTE[SrvInfoCode.TO_EOF], self.response.raw)
             if (tag := self.response.get_tag()) != SrvInfoCode.TO_EOF:  # pragma: no cover
                 raise InterfaceError(f"Service responded with error code: {tag}")
             result = self.response.read_bytes()
@@ -5525,8 +6025,8 @@ class Server(LoggingIdMixin):
           Line of service output, `None` for EOF or `.TIMEOUT` sentinel for expired timeout.
         """
         assert timeout >= 0
-        self.response.clear()
-        self._svc.query(self._make_request(timeout), bytes([SrvInfoCode.LINE]), self.response.raw)
+        self.response.rewind()
+        self._svc.query(_make_request_bytes(timeout), _BYTE[SrvInfoCode.LINE], self.response.raw)
         if (tag := self.response.get_tag()) != SrvInfoCode.LINE:  # pragma: no cover
             raise InterfaceError(f"Service responded with error code: {tag}")
         data = self.response.read_sized_string(encoding=self.encoding, errors=self.encoding_errors)
@@ -5546,48 +6046,47 @@ class Server(LoggingIdMixin):
           is used by iteration over `.Server` and `.readlines` method, they will block as
           well.
         """
-        if self._eof and not self.__line_buffer:
-            return None
         if not self.__line_buffer:
-            self._read_output()
-        elif len(self.__line_buffer) == 1:
-            line = self.__line_buffer.pop(0)
             if self._eof:
-                return line
-            self._read_output(init=line)
-            while not self.__line_buffer[0].endswith('\n'):
-                self._read_output(init=self.__line_buffer.pop(0))
+                return None
+            self._read_output()
+        if self.mode is SrvInfoCode.TO_EOF:
+            # Last buffered line could be incomplete
+            while len(self.__line_buffer) == 1 and not self._eof \
+                  and not self.__line_buffer[0].endswith('\n'):
+                self._read_output(init=self.__line_buffer.popleft())
         if self.__line_buffer:
-            return self.__line_buffer.pop(0)
+            return self.__line_buffer.popleft()
         return None
     def readlines(self) -> List[str]:
         """Get list of remaining output lines from last service query.
         """
-        return list(self)
-    def wait(self) -> None:
+        return list(self._drain_lines())
+    def wait(self, poll_interval: float=None) -> None:
         """Wait until running service completes, i.e. stops sending data.
+
+        Arguments:
+          poll_interval: Time in seconds to sleep between checks whether service is still
+                         running, once all its output was consumed. By default, service
+                         is polled again immediately.
         """
-        while self.is_running():
-            for _ in self:
+        while True:
+            for _ in self._drain_lines():
                 pass
+            if not self.is_running():
+                break
+            if poll_interval:
+                time.sleep(poll_interval)
     def close(self) -> None:
         """Close the server connection now (rather than whenever `__del__` is called).
         The instance will be unusable from this point forward; an `.Error`
         (or subclass) exception will be raised if any operation is attempted
         with the instance.
         """
-        if self.__info is not None:
-            self.__info._close()
-            self.__info = None
-        if self.__dbsvc is not None:
-            self.__dbsvc._close()
-            self.__dbsvc = None
-        if self.__trace is not None:
-            self.__trace._close()
-            self.__trace = None
-        if self.__user is not None:
-            self.__user._close()
-            self.__user = None
+        # Service providers are cached in instance dictionary by their properties
+        for name in ('info', 'database', 'trace', 'user'):
+            if (provider := self.__dict__.pop(name, None)) is not None:
+                provider._close()
         if self._svc is not None:
             # try..finally is necessary to shield from crashed server
             # Otherwise close() will be called from __del__ which may crash Python
@@ -5596,40 +6095,32 @@ class Server(LoggingIdMixin):
             finally:
                 self._svc = None
     # Properties
-    @property
+    @cached_property
     def info(self) -> ServerInfoProvider:
         """Access to various information about attached server.
         """
-        if self.__info is None:
-            self.__info = ServerInfoProvider(self.encoding, self)
-        return self.__info
-    @property
+        return ServerInfoProvider(self.encoding, self)
+    @cached_property
     def database(self) -> Union[ServerDbServices4, ServerDbServices3, ServerDbServices]:
         """Access to various database-related actions and services.
         """
-        if self.__dbsvc is None:
-            if self._engine_version() >= 5.0:
-                cls = ServerDbServices
-            elif self._engine_version() == 4.0:
-                cls = ServerDbServices4
-            else:
-                cls = ServerDbServices3
-            self.__dbsvc = cls(self)
-        return self.__dbsvc
-    @property
+        if self._engine_version() >= 5.0:
+            cls = ServerDbServices
+        elif self._engine_version() == 4.0:
+            cls = ServerDbServices4
+        else:
+            cls = ServerDbServices3
+        return cls(self)
+    @cached_property
     def trace(self) -> ServerTraceServices:
         """Access to various database-related actions and services.
         """
-        if self.__trace is None:
-            self.__trace = ServerTraceServices(self)
-        return self.__trace
-    @property
+        return ServerTraceServices(self)
+    @cached_property
     def user(self) -> ServerUserServices:
         """Access to various user-related actions and services.
         """
-        if self.__user is None:
-            self.__user = ServerUserServices(self)
-        return self.__user
+        return ServerUserServices(self)
 
 def connect_server(server: str, *, user: str=None, password: str=None,
                    crypt_callback: iCryptKeyCallbackImpl=None,
@@ -5678,13 +6169,17 @@ def connect_server(server: str, *, user: str=None, password: str=None,
         user = srv_config.user.value
     if password is None:
         password = srv_config.password.value
-    spb = SPB_ATTACH(user=user, password=password, config=srv_config.config.value,
-                     trusted_auth=srv_config.trusted_auth.value,
-                     auth_plugin_list=srv_config.auth_plugin_list.value,
-                     expected_db=expected_db, encoding=srv_config.encoding.value,
-                     errors=srv_config.encoding_errors.value, role=role)
-    spb_buf = spb.get_buffer()
-    with a.get_api().master.get_dispatcher() as provider:
+    config = srv_config.config.value
+    if (no_nagle := srv_config.no_nagle.value) is not None:
+        # TcpNoNagle is per-connection configurable, so it's passed as config override
+        no_nagle = f"TcpNoNagle = {'true' if no_nagle else 'false'}"
+        config = no_nagle if not config else f'{config}\n{no_nagle}'
+    spb_buf = SPB_ATTACH(user=user, password=password, config=config,
+                         trusted_auth=srv_config.trusted_auth.value,
+                         auth_plugin_list=srv_config.auth_plugin_list.value,
+                         expected_db=expected_db, encoding=srv_config.encoding.value,
+                         errors=srv_config.encoding_errors.value, role=role).get_buffer()
+    with _get_master().get_dispatcher() as provider:
         if crypt_callback is not None:
             provider.set_dbcrypt_callback(crypt_callback)
         svc = provider.attach_service_manager(host, spb_buf)
@@ -384,8 +384,9 @@ class iBlob_v3(iReferenceCounted):
         return result
     def get_info2(self, code: BlobInfoCode) -> Any:
         "Returns information about BLOB"
-        blob_info = (0).to_bytes(10, 'little')
-        self.get_info(bytes([code]), blob_info)
+        buffer = create_string_buffer(10)
+        self.get_info(bytes([code]), buffer)
+        blob_info = buffer.raw
         i = 0
         while blob_info[i] != isc_info_end:
             _code = blob_info[i]
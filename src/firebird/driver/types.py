@@ -1260,6 +1260,40 @@ class TableAccessStats:
     purges: int = None
     expunges: int = None
 
+@dataclass
+class PageStats:
+    """Database page statistics.
+
+    Data structure returned by `.DatabaseInfoProvider3.page_stats`.
+
+    Attributes:
+        allocated (int): Number of pages allocated for database
+        size_in_pages (int): Database size in pages
+        used (int): Number of database pages in active use
+        free (int): Number of free allocated pages in database
+    """
+    allocated: int
+    size_in_pages: int
+    used: int
+    free: int
+
+@dataclass
+class TransactionStats:
+    """Transaction counters of database.
+
+    Data structure returned by `.DatabaseInfoProvider3.transaction_stats`.
+
+    Attributes:
+        oit (int): ID of Oldest Interesting Transaction
+        oat (int): ID of Oldest Active Transaction
+        ost (int): ID of Oldest Snapshot Transaction
+        next_transaction (int): ID for next transaction
+    """
+    oit: int
+    oat: int
+    ost: int
+    next_transaction: int
+
 @dataclass
 class UserInfo:
     """Information about Firebird user.
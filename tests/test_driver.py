@@ -24,7 +24,7 @@
 # See LICENSE.TXT for details.
 
 import unittest
-#from unittest.mock import patch
+from unittest.mock import patch
 import datetime
 import sys
 import os
@@ -33,12 +33,13 @@ from firebird.base.logging import logging_manager, ANY, install_null_logger, \
      LoggingIdMixin
 from firebird.driver import *
 from firebird.driver.hooks import ConnectionHook, ServerHook, hook_manager, add_hook
-from firebird.driver.types import ImpData, ImpDataOld
+from firebird.driver.types import ImpData, ImpDataOld, SrvRepairOption, ServerAction
 import firebird.driver as driver
 import sys, os
 import threading
 import time
 import decimal
+import struct
 from re import finditer
 
 from io import StringIO, BytesIO
@@ -304,6 +305,33 @@ class TestConnection(DriverTestBase):
             dpb.extend((ord('?'), 4, 3, 0, 0, 0))
             self.assertEqual(con._dpb, bytes(dpb))
             self.assertEqual(con.dsn, self.dbfile)
+    def test_connect_server_no_nagle(self):
+        def get_spb_config(svc):
+            spb = driver.core.SPB_ATTACH()
+            spb.parse_buffer(svc.spb)
+            return spb.config
+
+        cfg = driver_config.get_server('server.nonagle')
+        if cfg is None:
+            cfg = driver_config.register_server('server.nonagle')
+        cfg.host.value = FBTEST_HOST
+        cfg.user.value = FBTEST_USER
+        cfg.password.value = FBTEST_PASSWORD
+        # Not set: config is not changed
+        with connect_server('server.nonagle') as svc:
+            self.assertIsNone(get_spb_config(svc))
+        # Empty config
+        cfg.no_nagle.value = True
+        with connect_server('server.nonagle') as svc:
+            self.assertEqual(get_spb_config(svc), 'TcpNoNagle = true')
+        # Appended to existing config
+        cfg.config.value = 'ConnectionTimeout = 180'
+        cfg.no_nagle.value = False
+        with connect_server('server.nonagle') as svc:
+            self.assertEqual(get_spb_config(svc), 'ConnectionTimeout = 180\nTcpNoNagle = false')
+        cfg.no_nagle.value = None
+        with connect_server('server.nonagle') as svc:
+            self.assertEqual(get_spb_config(svc), 'ConnectionTimeout = 180')
     def test_connect_config(self):
         srv_config = f"""
         [server.local]
@@ -362,6 +390,30 @@ class TestConnection(DriverTestBase):
             con._logging_id_ = self.__class__.__name__
             self.assertIsNotNone(con._att)
             self.assertEqual(con.dsn, f'inet4://{FBTEST_HOST}:3050/{self.dbfile}')
+    def test_dpb(self):
+        dpb = driver.core.DPB(user='SYSDBA', password='masterkey', role='ADMIN',
+                              charset='WIN1250', timeout=30, no_gc=True,
+                              no_db_triggers=True, session_time_zone='UTC',
+                              decfloat_round=DecfloatRound.HALF_UP, parallel_workers=4,
+                              page_size=8192, forced_writes=False, sweep_interval=0)
+        dpb_buffer = dpb.get_buffer(for_create=True)
+        dpb = driver.core.DPB()
+        dpb.parse_buffer(dpb_buffer)
+        self.assertEqual(dpb.user, 'SYSDBA')
+        self.assertEqual(dpb.password, 'masterkey')
+        self.assertEqual(dpb.role, 'ADMIN')
+        self.assertEqual(dpb.charset, 'WIN1250')
+        self.assertEqual(dpb.sql_dialect, 3)
+        self.assertEqual(dpb.timeout, 30)
+        self.assertTrue(dpb.no_gc)
+        self.assertTrue(dpb.no_db_triggers)
+        self.assertFalse(dpb.no_linger)
+        self.assertEqual(dpb.session_time_zone, 'UTC')
+        self.assertEqual(dpb.decfloat_round, DecfloatRound.HALF_UP)
+        self.assertEqual(dpb.parallel_workers, 4)
+        self.assertEqual(dpb.page_size, 8192)
+        self.assertFalse(dpb.forced_writes)
+        self.assertEqual(dpb.sweep_interval, 0)
     def test_properties(self):
         with connect(self.dbfile, user=FBTEST_USER, password=FBTEST_PASSWORD) as con:
             con._logging_id_ = self.__class__.__name__
@@ -481,6 +533,25 @@ class TestConnection(DriverTestBase):
             self.assertLessEqual(con.info.oit, con.info.next_transaction)
             self.assertLessEqual(con.info.oat, con.info.next_transaction)
             self.assertLessEqual(con.info.ost, con.info.next_transaction)
+            # Values obtained with single info request
+            stats = con.info.page_stats
+            self.assertIsInstance(stats, driver.types.PageStats)
+            self.assertEqual(stats.allocated, con.info.pages_allocated)
+            self.assertEqual(stats.size_in_pages, con.info.size_in_pages)
+            self.assertEqual(stats.used, con.info.pages_used)
+            self.assertEqual(stats.free, con.info.pages_free)
+            stats = con.info.transaction_stats
+            self.assertIsInstance(stats, driver.types.TransactionStats)
+            self.assertEqual(stats.oit, con.info.oit)
+            self.assertEqual(stats.oat, con.info.oat)
+            self.assertEqual(stats.ost, con.info.ost)
+            self.assertEqual(stats.next_transaction, con.info.next_transaction)
+            codes = [DbInfoCode.USER_NAMES, DbInfoCode.PAGE_SIZE, DbInfoCode.DB_ID,
+                     DbInfoCode.SWEEP_INTERVAL, DbInfoCode.ODS_VERSION]
+            res = con.info.get_info_values(codes)
+            self.assertListEqual(list(res), codes)
+            for code in codes:
+                self.assertEqual(res[code], con.info.get_info(code))
             #
             self.assertIsInstance(con.info.reads, int)
             self.assertIsInstance(con.info.fetches, int)
@@ -653,6 +724,18 @@ class TestTransaction(DriverTestBase):
         self.assertListEqual(tpb._table_reservation, [('COUNTRY',
                                                        TableShareMode.PROTECTED,
                                                        TableAccessMode.LOCK_WRITE)])
+        # NO_WAIT
+        tpb = TPB(lock_timeout=0)
+        tpb_buffer = tpb.get_buffer()
+        tpb = TPB()
+        tpb.parse_buffer(tpb_buffer)
+        self.assertEqual(tpb.lock_timeout, 0)
+        # WAIT without timeout
+        tpb.lock_timeout = -1
+        tpb_buffer = tpb.get_buffer()
+        tpb = TPB(lock_timeout=0)
+        tpb.parse_buffer(tpb_buffer)
+        self.assertEqual(tpb.lock_timeout, -1)
     def test_transaction_info(self):
         self.con.begin()
         with self.con.main_transaction as tr:
@@ -822,57 +905,75 @@ class TestDistributedTransaction(DriverTestBase):
                     cc2.execute(q)
                     result = cc2.fetchall()
                 self.assertListEqual(result, [(1, None), (2, None), (3, None)])
+    def _make_limbo_transactions(self) -> tuple:
+        # Leaves prepared distributed transaction in limbo in both databases, and
+        # returns IDs of these limbo transactions
+        dt = DistributedTransactionManager([self.con1, self.con2])
+        dt.execute_immediate('insert into t (pk) values (3)')
+        dt.prepare()
+        # Force out both connections
+        dt._tra.release()
+        dt._tra = None
+        dt.close()
+        self.con1.close()
+        self.con2.close()
+        #
+        self.con1 = connect('dts-1')
+        self.con2 = connect('dts-2')
+        with connect_server('FBTEST_HOST') as svc:
+            ids1 = svc.database.get_limbo_transaction_ids(database=self.db1)
+            self.assertEqual(len(ids1), 1)
+            ids2 = svc.database.get_limbo_transaction_ids(database=self.db2)
+            self.assertEqual(len(ids2), 1)
+        return ids1[0], ids2[0]
     def test_limbo_transactions(self):
-        self.skipTest('Not implemented yet')
-        #return
-        #with connect_server('FBTEST_HOST') as svc:
-            #dt = DistributedTransactionManager([self.con1, self.con2])
-            #ids1 = svc.database.get_limbo_transaction_ids(database=self.db1)
-            #self.assertEqual(ids1, [])
-            #ids2 = svc.database.get_limbo_transaction_ids(database=self.db2)
-            #self.assertEqual(ids2, [])
-            #dt.execute_immediate('insert into t (pk) values (3)')
-            #dt.prepare()
-            ## Force out both connections
-            #dt._tra.release()
-            #dt._tra = None
-            #dt.close()
-            #self.con1.close()
-            #self.con2.close()
-            ##
-            #self.con1 = connect('dts-1')
-            #self.con2 = connect('dts-2')
-            #ids1 = svc.database.get_limbo_transaction_ids(database=self.db1)
-            #id1 = ids1[0]
-            #ids2 = svc.database.get_limbo_transaction_ids(database=self.db2)
-            #id2 = ids2[0]
-            ## Data should be blocked by limbo transaction
-            #c1 = self.con1.cursor()
-            #c1.execute('select * from t')
-            #with self.assertRaises(DatabaseError) as cm:
-                #row = c1.fetchall()
-            #self.assertTupleEqual(cm.exception.args,
-                                  #('Cursor.fetchone:\n- SQLCODE: -911\n- record from transaction %i is stuck in limbo' % id1, -911, 335544459))
-            #c2 = self.con2.cursor()
-            #c2.execute('select * from t')
-            #with self.assertRaises(DatabaseError) as cm:
-                #row = c2.fetchall()
-            #self.assertTupleEqual(cm.exception.args,
-                                  #('Cursor.fetchone:\n- SQLCODE: -911\n- record from transaction %i is stuck in limbo' % id2, -911, 335544459))
-            ## resolve via service
-            #svc = connect_server(host=FBTEST_HOST, password=FBTEST_PASSWORD)
-            #svc.database.commit_limbo_transaction(database=self.db1, transaction_id=id1)
-            #svc.database.rollback_limbo_transaction(database=self.db2, transaction_id=id2)
-
-            ## check the resolution
-            #c1 = self.con1.cursor()
-            #c1.execute('select * from t')
-            #row = c1.fetchall()
-            #self.assertListEqual(row, [(3, None)])
-            #c2 = self.con2.cursor()
-            #c2.execute('select * from t')
-            #row = c2.fetchall()
-            #self.assertListEqual(row, [])
+        with connect_server('FBTEST_HOST') as svc:
+            ids1 = svc.database.get_limbo_transaction_ids(database=self.db1)
+            self.assertEqual(ids1, [])
+            ids2 = svc.database.get_limbo_transaction_ids(database=self.db2)
+            self.assertEqual(ids2, [])
+        id1, id2 = self._make_limbo_transactions()
+        # Data should be blocked by limbo transaction
+        with self.con1.cursor() as c1:
+            c1.execute('select * from t')
+            with self.assertRaises(DatabaseError) as cm:
+                c1.fetchall()
+            self.assertIn(f'record from transaction {id1} is stuck in limbo', cm.exception.args[0])
+        with self.con2.cursor() as c2:
+            c2.execute('select * from t')
+            with self.assertRaises(DatabaseError) as cm:
+                c2.fetchall()
+            self.assertIn(f'record from transaction {id2} is stuck in limbo', cm.exception.args[0])
+        self.con1.rollback()
+        self.con2.rollback()
+        # resolve via service
+        with connect_server('FBTEST_HOST') as svc:
+            svc.database.commit_limbo_transaction(database=self.db1, transaction_id=id1)
+            svc.database.rollback_limbo_transaction(database=self.db2, transaction_id=id2)
+            self.assertEqual(svc.database.get_limbo_transaction_ids(database=self.db1), [])
+            self.assertEqual(svc.database.get_limbo_transaction_ids(database=self.db2), [])
+        # check the resolution
+        with self.con1.cursor() as c1:
+            c1.execute('select * from t')
+            self.assertListEqual(c1.fetchall(), [(3, None)])
+        with self.con2.cursor() as c2:
+            c2.execute('select * from t')
+            self.assertListEqual(c2.fetchall(), [])
+        self.con1.commit()
+        self.con2.commit()
+        # resolve multiple transactions via service
+        id1, id2 = self._make_limbo_transactions()
+        with connect_server('FBTEST_HOST') as svc:
+            svc.database.rollback_limbo_transactions(database=self.db1, transaction_ids=[id1])
+            svc.database.commit_limbo_transactions(database=self.db2, transaction_ids=[id2])
+            self.assertEqual(svc.database.get_limbo_transaction_ids(database=self.db1), [])
+            self.assertEqual(svc.database.get_limbo_transaction_ids(database=self.db2), [])
+        with self.con1.cursor() as c1:
+            c1.execute('select * from t')
+            self.assertListEqual(c1.fetchall(), [(3, None)])
+        with self.con2.cursor() as c2:
+            c2.execute('select * from t')
+            self.assertListEqual(c2.fetchall(), [(3, None)])
 
 class TestCursor(DriverTestBase):
     def setUp(self):
@@ -1172,7 +1273,7 @@ class TestPreparedStatement(DriverTestBase):
         self.con.close()
         self.con2.close()
     def test_basic(self):
-        self.assertListEqual(self.con._statements, [])
+        self.assertEqual(len(self.con._statements), 0)
         with self.con.cursor() as cur:
             ps = cur.prepare('select * from country')
             self.assertEqual(len(self.con._statements), 1)
@@ -1181,7 +1282,7 @@ class TestPreparedStatement(DriverTestBase):
             self.assertEqual(ps.type, StatementType.SELECT)
             self.assertEqual(ps.sql, 'select * from country')
             self.con.close()
-            self.assertEqual(self.con._statements, [])
+            self.assertEqual(len(self.con._statements), 0)
     def test_get_plan(self):
         with self.con.cursor() as cur:
             ps = cur.prepare('select * from job')
@@ -1674,6 +1775,15 @@ class TestServerStandard(DriverTestBase):
             self.assertTrue(svc.is_running())
             svc.wait()
             self.assertFalse(svc.is_running())
+            # Wait with sleep between polls
+            svc.info.get_log()
+            self.assertTrue(svc.is_running())
+            svc.wait(poll_interval=0.01)
+            self.assertFalse(svc.is_running())
+            svc.database.validate(database=os.path.join(self.dbpath, self.FBTEST_DB))
+            self.assertTrue(svc.is_running())
+            svc.wait(poll_interval=0.01)
+            self.assertFalse(svc.is_running())
 
 class TestServerServices(DriverTestBase):
     def setUp(self):
@@ -1726,9 +1836,46 @@ class TestServerServices(DriverTestBase):
         self.assertGreater(len(output), 0)
         self.assertEqual(output, log)
     def test_04_get_limbo_transaction_ids(self):
-        self.skipTest('Not implemented yet')
         ids = self.svc.database.get_limbo_transaction_ids(database='employee')
         self.assertIsInstance(ids, type(list()))
+        self.assertListEqual(ids, [])
+        # Binary report parser: 32 and 64-bit IDs with description clumplets
+        report = b''.join([bytes([SrvRepairOption.SINGLE_TRA_ID]), struct.pack('<I', 10),
+                           bytes([SrvRepairOption.TRA_STATE, 1]),
+                           bytes([SrvRepairOption.TRA_HOST_SITE]), struct.pack('<H', 4), b'host',
+                           bytes([SrvRepairOption.TRA_ADVISE, 2]),
+                           bytes([SrvRepairOption.MULTI_TRA_ID_64]), struct.pack('<Q', 2 ** 40),
+                           bytes([SrvRepairOption.TRA_ID]), struct.pack('<I', 11),
+                           bytes([SrvRepairOption.TRA_ID_64]), struct.pack('<Q', 2 ** 33),
+                           bytes([SrvRepairOption.TRA_REMOTE_SITE]), struct.pack('<H', 6), b'remote',
+                           bytes([SrvRepairOption.TRA_DB_PATH]), struct.pack('<H', 6), b'db.fdb',
+                           bytes([SrvRepairOption.MULTI_TRA_ID]), struct.pack('<I', 65536)])
+        self.assertListEqual(driver.core._parse_limbo_trans_ids(report), [10, 2 ** 40, 65536])
+        self.assertListEqual(driver.core._parse_limbo_trans_ids(b''), [])
+    def test_04_resolve_limbo_transactions(self):
+        # One request per transaction, 64-bit option is used for IDs above USHRT_MAX
+        ushrt_max = 65535
+        for method, tag, tag_64 in [(self.svc.database.commit_limbo_transactions,
+                                     SrvRepairOption.COMMIT_TRANS, SrvRepairOption.COMMIT_TRANS_64),
+                                    (self.svc.database.rollback_limbo_transactions,
+                                     SrvRepairOption.ROLLBACK_TRANS, SrvRepairOption.ROLLBACK_TRANS_64)]:
+            with patch.object(self.svc, '_svc') as isvc, \
+                 patch.object(self.svc, '_read_all_binary_output') as read_output:
+                method(database='employee', transaction_ids=[ushrt_max, ushrt_max + 1])
+                buffers = [call.args[0] for call in isvc.start.call_args_list]
+                self.assertEqual(len(buffers), 2)
+                self.assertEqual(read_output.call_count, 2)
+            self.assertTrue(buffers[0].endswith(bytes([tag]) + struct.pack('<I', ushrt_max)))
+            self.assertTrue(buffers[1].endswith(bytes([tag_64]) + struct.pack('<Q', ushrt_max + 1)))
+            self.assertEqual(buffers[0][0], ServerAction.REPAIR)
+        # Single transaction variants
+        with patch.object(self.svc, '_svc') as isvc, \
+             patch.object(self.svc, '_read_all_binary_output'):
+            self.svc.database.commit_limbo_transaction(database='employee', transaction_id=10)
+            self.svc.database.rollback_limbo_transaction(database='employee', transaction_id=2 ** 33)
+            buffers = [call.args[0] for call in isvc.start.call_args_list]
+        self.assertTrue(buffers[0].endswith(bytes([SrvRepairOption.COMMIT_TRANS]) + struct.pack('<I', 10)))
+        self.assertTrue(buffers[1].endswith(bytes([SrvRepairOption.ROLLBACK_TRANS_64]) + struct.pack('<Q', 2 ** 33)))
     def test_05_trace(self):
         #self.skipTest('Not implemented yet')
         trace_config = """database = %s
@@ -2020,6 +2167,21 @@ class TestServerDatabaseServices(DriverTestBase):
         with connect(f"{FBTEST_HOST}:{self.rfdb}", user=FBTEST_USER, password=FBTEST_PASSWORD) as con:
             con._logging_id_ = self.__class__.__name__
             self.assertEqual(con.info.sweep_interval, 10000)
+        # Value changed by other means is set again, as property cache is not enabled
+        self.assertFalse(self.svc.cache_properties)
+        with connect_server(FBTEST_HOST, user=FBTEST_USER, password=FBTEST_PASSWORD) as svc2:
+            svc2.database.set_sweep_interval(database=self.rfdb, interval=5000)
+        self.svc.database.set_sweep_interval(database=self.rfdb, interval=10000)
+        with connect(f"{FBTEST_HOST}:{self.rfdb}", user=FBTEST_USER, password=FBTEST_PASSWORD) as con:
+            self.assertEqual(con.info.sweep_interval, 10000)
+        # With property cache enabled, setting the same value again is skipped
+        self.svc.cache_properties = True
+        self.svc.database.set_sweep_interval(database=self.rfdb, interval=10000)
+        with connect_server(FBTEST_HOST, user=FBTEST_USER, password=FBTEST_PASSWORD) as svc2:
+            svc2.database.set_sweep_interval(database=self.rfdb, interval=5000)
+        self.svc.database.set_sweep_interval(database=self.rfdb, interval=10000)
+        with connect(f"{FBTEST_HOST}:{self.rfdb}", user=FBTEST_USER, password=FBTEST_PASSWORD) as con:
+            self.assertEqual(con.info.sweep_interval, 5000)
     def test_shutdown_bring_online(self):
         #self.skipTest('Not implemented yet')
         # Shutdown database to single-user maintenance mode
@@ -2104,6 +2266,15 @@ class TestServerDatabaseServices(DriverTestBase):
         output = []
         self.svc.database.validate(database=self.dbfile, callback=fetchline)
         self.assertGreater(len(output), 0)
+        all_lines = output
+        # callback with client side filter
+        output = []
+        self.svc.database.validate(database=self.dbfile, callback=fetchline,
+                                   client_filter='Validation (started|finished)')
+        self.assertEqual(len(output), 2)
+        self.assertLess(len(output), len(all_lines))
+        self.assertIn('Validation started', output[0])
+        self.assertIn('Validation finished', output[1])
         # Parameters
         self.svc.database.validate(database=self.dbfile, include_table='COUNTRY|SALES',
                           include_index='SALESTATX', lock_timeout=-1)